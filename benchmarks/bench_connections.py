@@ -0,0 +1,77 @@
+"""
+Connect/disconnect storm benchmark for the shared connection registry.
+
+Registers --sockets in-memory connections the way websocket_endpoint does
+(registry entry, default topics, one snapshot per topic), --tabs per user,
+fans one price update out to all of them, then drops them in random order.
+Each connect and disconnect should cost the same however many sockets are
+already open.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_connections --sockets 20000 --rounds 3
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import NullWebSocket  # noqa: E402  (sets up the environment)
+from config import settings  # noqa: E402
+from services.price_service import PriceService  # noqa: E402
+from websocket.connection import ClientConnection  # noqa: E402
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sockets", type=int, default=20000)
+    parser.add_argument("--tabs", type=int, default=2, help="connections per user")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    price_service = PriceService()
+    await price_service.mt5_service.connect()
+    price_service._reset_daily_stats()
+    backend = price_service.mt5_service.backend
+    for symbol in settings.SYMBOLS:
+        await price_service._process_tick(symbol, backend.next_tick(symbol), {})
+
+    user_ids = [str(uuid.uuid4()) for _ in range(max(1, args.sockets // args.tabs))]
+    rng = random.Random(1)
+    for round_ in range(1, args.rounds + 1):
+        connections = []
+        started = time.perf_counter()
+        for i in range(args.sockets):
+            user_id = user_ids[i % len(user_ids)]
+            connection = ClientConnection(NullWebSocket(), user_id)
+            price_service.add_subscriber(connection, user_id)
+            connections.append(connection)
+        connected = time.perf_counter() - started
+
+        symbol = settings.SYMBOLS[0]
+        started = time.perf_counter()
+        await price_service._process_tick(symbol, backend.next_tick(symbol), {})
+        fanned_out = time.perf_counter() - started
+
+        rng.shuffle(connections)
+        started = time.perf_counter()
+        for connection in connections:
+            price_service.remove_subscriber(connection)
+        disconnected = time.perf_counter() - started
+
+        print(f"round {round_}: connect {args.sockets:,} in {connected * 1e3:,.0f} ms "
+              f"({connected / args.sockets * 1e6:,.1f} us each), "
+              f"one price to all in {fanned_out * 1e3:,.1f} ms, "
+              f"disconnect in {disconnected * 1e3:,.0f} ms "
+              f"({disconnected / args.sockets * 1e6:,.1f} us each)")
+    print(f"left registered: {len(price_service.registry)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,183 @@
+"""
+End-to-end tick pipeline benchmark on the simulator backend.
+
+Drives PriceService._process_tick with simulated ticks for every configured
+symbol: daily stats, limit/SL-TP trigger evaluation (TradeService), price
+broadcast and batched per-user position P&L frames to in-memory sockets,
+each behind the same bounded send queue and writer task a real client gets.
+Positions, limit orders and SL/TP levels are seeded in memory and kept away
+from the market so the trigger indexes are exercised without hitting a
+database.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --ticks 100000 --positions 20000 --users 2000
+
+--slow adds clients whose sends take 50 ms, like a stalled mobile link; tick
+throughput should not change.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.Settings requires these; the benchmark never opens a connection
+for key, value in {
+    "DATABASE_HOST": "localhost", "DATABASE_PORT": "5432", "DATABASE_USER": "bench",
+    "DATABASE_PASSWORD": "bench", "DATABASE_NAME": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+os.environ["MARKET_DATA_BACKEND"] = "simulator"
+os.environ["LEADER_ELECTION_ENABLED"] = "false"  # single process: always the leader
+
+from config import settings  # noqa: E402
+from models.trade import TradeType, TradeStatus  # noqa: E402
+from services.price_service import PriceService, PositionEvent  # noqa: E402
+from services.trade_service import TradeService  # noqa: E402
+from websocket.connection import ClientConnection  # noqa: E402
+from websocket.encoding import JSON, available_formats  # noqa: E402
+
+
+class NullWebSocket:
+    """Accepts frames and counts bytes, like a client on a fast link"""
+
+    def __init__(self):
+        self.frames = 0
+        self.bytes = 0
+
+    async def send_text(self, message: str):
+        self.frames += 1
+        self.bytes += len(message)
+
+    async def send_bytes(self, message: bytes):
+        await self.send_text(message)
+
+
+class SlowWebSocket(NullWebSocket):
+    """A client that takes SLOW_SEND_SECONDS for every frame"""
+
+    async def send_text(self, message: str):
+        await asyncio.sleep(SLOW_SEND_SECONDS)
+        await super().send_text(message)
+
+
+SLOW_SEND_SECONDS = 0.05
+
+
+def open_connection(price_service: PriceService, websocket, user_id=None, fmt: str = JSON) -> ClientConnection:
+    """Register an in-memory socket the way websocket_endpoint does"""
+    connection = ClientConnection(websocket, user_id, fmt)
+    price_service.add_subscriber(connection, user_id)
+    connection.start(on_close=price_service.remove_subscriber)
+    return connection
+
+
+async def drain(connections):
+    """Wait until the writer tasks have sent everything still queued"""
+    while any(connection.queue for connection in connections if not connection.closed):
+        await asyncio.sleep(0)
+
+
+def seed(price_service: PriceService, trade_service: TradeService, positions: int, users: int):
+    rng = random.Random(1)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    backend = price_service.mt5_service.backend
+    for i in range(positions):
+        symbol = settings.SYMBOLS[i % len(settings.SYMBOLS)]
+        tick = backend.next_tick(symbol)
+        mid = (tick["bid"] + tick["ask"]) / 2
+        side = TradeType.BUY if rng.random() < 0.5 else TradeType.SELL
+        sign = 1 if side == TradeType.BUY else -1
+        trade = SimpleNamespace(
+            id=uuid.uuid4(),
+            ticket=uuid.uuid4().hex[:8].upper(),
+            users_id=rng.choice(user_ids),
+            symbol=symbol,
+            user_type=side,
+            volume=round(rng.uniform(0.01, 2.0), 2),
+            entry_price=mid,
+            margin_required=100.0,
+            stop_loss=mid * (1 - sign * 0.5),
+            take_profit=mid * (1 + sign * 0.5),
+            open_time=datetime.now(),
+            status=TradeStatus.EXECUTED,
+        )
+        price_service.publish_position_event(PositionEvent.OPENED, trade)
+        trade_service.track_position_levels(trade)
+
+        pending = SimpleNamespace(
+            id=uuid.uuid4(),
+            ticket=uuid.uuid4().hex[:8].upper(),
+            users_id=trade.users_id,
+            symbol=symbol,
+            user_type=side,
+            entry_price=mid * (1 - sign * 0.5),
+        )
+        trade_service.track_pending_order(pending)
+    return user_ids
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=100000)
+    parser.add_argument("--positions", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--connected", type=float, default=0.5, help="share of users with an open socket")
+    parser.add_argument("--slow", type=int, default=0, help="extra anonymous clients with a slow link")
+    parser.add_argument("--format", choices=available_formats(), default=JSON, help="wire format of the sockets")
+    args = parser.parse_args()
+
+    price_service = PriceService()
+    trade_service = TradeService(price_service)
+    price_service.set_trade_service(trade_service)
+    await price_service.mt5_service.connect()
+    price_service._reset_daily_stats()
+
+    user_ids = seed(price_service, trade_service, args.positions, args.users)
+    sockets = []
+    connections = []
+    for user_id in user_ids[:int(len(user_ids) * args.connected)]:
+        websocket = NullWebSocket()
+        sockets.append(websocket)
+        connections.append(open_connection(price_service, websocket, str(user_id), args.format))
+        price_service.update_account_balance(str(user_id), 10000.0)
+    slow_connections = [open_connection(price_service, SlowWebSocket()) for _ in range(args.slow)]
+
+    backend = price_service.mt5_service.backend
+    symbols = list(settings.SYMBOLS)
+    rounds = max(1, args.ticks // len(symbols))
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        position_batch = {}
+        for symbol in symbols:
+            await price_service._process_tick(symbol, backend.next_tick(symbol), position_batch)
+        price_service._broadcast_position_batch(position_batch)
+        # The live loop yields between polls; writer tasks drain the queues here
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    await drain(connections)
+
+    ticks = rounds * len(symbols)
+    frames = sum(ws.frames for ws in sockets)
+    sent = sum(ws.bytes for ws in sockets)
+    print(f"symbols:      {len(symbols)}")
+    print(f"positions:    {args.positions} across {args.users} users ({len(sockets)} connected)")
+    print(f"ticks:        {ticks} in {elapsed:.2f}s -> {ticks / elapsed:,.0f} ticks/s")
+    print(f"per tick:     {elapsed / ticks * 1e6:,.1f} us")
+    print(f"frames sent:  {frames:,} ({sent / 1e6:,.1f} MB)")
+    if slow_connections:
+        dropped = sum(connection.closed for connection in slow_connections)
+        print(f"slow clients: {len(slow_connections)}, {dropped} disconnected as slow consumers")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
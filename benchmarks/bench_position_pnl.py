@@ -0,0 +1,154 @@
+"""
+Benchmark: per-trade Python P&L loop vs. vectorized PositionBook.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_position_pnl --positions 50000 --ticks 50
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.Settings requires these; the benchmark never opens a connection
+for key, value in {
+    "DATABASE_HOST": "localhost", "DATABASE_PORT": "5432", "DATABASE_USER": "bench",
+    "DATABASE_PASSWORD": "bench", "DATABASE_NAME": "bench",
+    "MT5_LOGIN": "0", "MT5_PASSWORD": "bench", "MT5_SERVER": "bench",
+}.items():
+    os.environ.setdefault(key, value)
+
+from models.trade import TradeType, TradeStatus  # noqa: E402
+from services.position_book import PositionBook  # noqa: E402
+
+SYMBOL = "XAUUSD"
+CONTRACT_SIZE = 100
+POINT_VALUE = 0.1
+PIP_MULTIPLIER = 10
+
+
+def make_trades(count: int, users: int = 1000):
+    rng = random.Random(42)
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    return [
+        SimpleNamespace(
+            id=uuid.uuid4(),
+            users_id=rng.choice(user_ids),
+            ticket=uuid.uuid4().hex[:8].upper(),
+            symbol=SYMBOL,
+            user_type=TradeType.BUY if rng.random() < 0.5 else TradeType.SELL,
+            volume=round(rng.uniform(0.01, 5.0), 2),
+            entry_price=rng.uniform(2300.0, 2400.0),
+            open_time=datetime.now(),
+            status=TradeStatus.EXECUTED,
+        )
+        for _ in range(count)
+    ]
+
+
+async def get_contract_size(symbol: str) -> float:
+    """Mirrors the previous async helper, dict rebuilt on every call"""
+    contract_sizes = {"EURUSD": 100000, "USDJPY": 100000, "XAUUSD": 100}
+    return contract_sizes.get(symbol, 100000)
+
+
+def get_point_value(symbol: str) -> float:
+    if "JPY" in symbol:
+        return 0.01
+    elif symbol == "XAUUSD":
+        return 0.1
+    return 1
+
+
+def calculate_pips(symbol: str, entry_price: float, current_price: float, trade_type: str) -> float:
+    price_diff = current_price - entry_price if trade_type == 'buy' else entry_price - current_price
+    if "JPY" in symbol:
+        return price_diff * 100
+    elif symbol == "XAUUSD":
+        return price_diff * 10
+    return price_diff * 10000
+
+
+async def legacy_tick(trades, bid: float, ask: float):
+    """The per-trade loop PriceService ran before PositionBook"""
+    results = []
+    for trade in trades:
+        current_price = bid if trade.user_type.value == 'buy' else ask
+        if trade.user_type.value == 'buy':
+            price_diff = current_price - trade.entry_price
+        else:
+            price_diff = trade.entry_price - current_price
+        point_value = get_point_value(SYMBOL)
+        contract_size = await get_contract_size(SYMBOL)
+        unrealized_pnl = price_diff * trade.volume * contract_size * point_value
+        pips = calculate_pips(SYMBOL, trade.entry_price, current_price, trade.user_type.value)
+        results.append((current_price, round(unrealized_pnl, 2), round(price_diff, 5), round(pips, 1)))
+    return results
+
+
+def vectorized_tick(book: PositionBook, bid: float, ask: float):
+    current_price, price_diff, unrealized_pnl, pips = book.compute(bid, ask)
+    return (
+        current_price.tolist(),
+        unrealized_pnl.round(2).tolist(),
+        price_diff.round(5).tolist(),
+        pips.round(1).tolist(),
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--positions", type=int, default=50000)
+    parser.add_argument("--ticks", type=int, default=50)
+    args = parser.parse_args()
+
+    trades = make_trades(args.positions)
+    book = PositionBook(SYMBOL, CONTRACT_SIZE, POINT_VALUE, PIP_MULTIPLIER, capacity=len(trades))
+    for trade in trades:
+        book.add(trade)
+
+    rng = random.Random(7)
+    ticks = []
+    for _ in range(args.ticks):
+        bid = rng.uniform(2300.0, 2400.0)
+        ticks.append((bid, bid + 0.3))
+
+    # Sanity check: both paths agree on P&L
+    legacy = await legacy_tick(trades, *ticks[0])
+    _, pnl, _, _ = vectorized_tick(book, *ticks[0])
+    mismatches = sum(1 for row, values in enumerate(legacy) if abs(values[1] - pnl[row]) > 0.011)
+    if mismatches:
+        raise SystemExit(f"P&L mismatch on {mismatches} positions")
+
+    started = time.perf_counter()
+    for bid, ask in ticks:
+        await legacy_tick(trades, bid, ask)
+    legacy_elapsed = (time.perf_counter() - started) / len(ticks)
+
+    started = time.perf_counter()
+    for bid, ask in ticks:
+        vectorized_tick(book, bid, ask)
+    vectorized_elapsed = (time.perf_counter() - started) / len(ticks)
+
+    started = time.perf_counter()
+    for bid, ask in ticks:
+        book.compute(bid, ask)
+    compute_elapsed = (time.perf_counter() - started) / len(ticks)
+
+    print(f"positions:              {args.positions}")
+    print(f"legacy loop:            {legacy_elapsed * 1000:9.3f} ms/tick")
+    print(f"vectorized (+tolist):   {vectorized_elapsed * 1000:9.3f} ms/tick")
+    print(f"vectorized (compute):   {compute_elapsed * 1000:9.3f} ms/tick")
+    print(f"speedup:                {legacy_elapsed / vectorized_elapsed:9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
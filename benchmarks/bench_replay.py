@@ -0,0 +1,65 @@
+"""
+Replay recorded tick files through the full tick pipeline.
+
+Loads <dir>/<symbol>/<day>.ticks written by the tick recorder, seeds the same
+in-memory positions, limit orders and sockets as bench_pipeline, and feeds the
+ticks through PriceService.ingest_ticks at the requested speed (0 = as fast as
+possible).
+
+Run from the repository root:
+
+    python -m benchmarks.bench_replay --dir ticks --day 2026-10-18 --speed 0 --positions 20000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_pipeline import NullWebSocket, drain, open_connection, seed  # noqa: E402  (sets up the environment)
+from services.price_service import PriceService  # noqa: E402
+from services.tick_replay import TickReplay  # noqa: E402
+from services.trade_service import TradeService  # noqa: E402
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", default="ticks")
+    parser.add_argument("--day", required=True, help="YYYY-MM-DD")
+    parser.add_argument("--speed", type=float, default=0.0, help="1 = real time, N = N times faster, 0 = max")
+    parser.add_argument("--positions", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--connected", type=float, default=0.5, help="share of users with an open socket")
+    args = parser.parse_args()
+
+    price_service = PriceService()
+    trade_service = TradeService(price_service)
+    price_service.set_trade_service(trade_service)
+    await price_service.mt5_service.connect()
+    price_service._reset_daily_stats()
+
+    user_ids = seed(price_service, trade_service, args.positions, args.users)
+    sockets = []
+    connections = []
+    for user_id in user_ids[:int(len(user_ids) * args.connected)]:
+        websocket = NullWebSocket()
+        sockets.append(websocket)
+        connections.append(open_connection(price_service, websocket, str(user_id)))
+        price_service.update_account_balance(str(user_id), 10000.0)
+
+    replay = TickReplay.from_day(price_service, args.dir, args.day, speed=args.speed)
+    print(f"symbols:      {', '.join(replay.symbols)}")
+    print(f"positions:    {args.positions} across {args.users} users ({len(sockets)} connected)")
+    stats = await replay.run()
+    replay.close()
+    await drain(connections)
+
+    print(f"ticks:        {stats['ticks']} in {stats['rounds']} rounds, {stats['elapsed']:.2f}s "
+          f"-> {stats['ticks_per_second']:,.0f} ticks/s")
+    print(f"frames sent:  {sum(ws.frames for ws in sockets):,} ({sum(ws.bytes for ws in sockets) / 1e6:,.1f} MB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
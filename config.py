@@ -18,13 +18,61 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
     
     # MT5
-    MT5_LOGIN: int
-    MT5_PASSWORD: str
-    MT5_SERVER: str
+    MT5_LOGIN: int = 0
+    MT5_PASSWORD: str = ""
+    MT5_SERVER: str = ""
+    MT5_CALL_TIMEOUT: float = 5.0  # seconds per terminal call (ticks, symbol info)
+    MT5_ORDER_TIMEOUT: float = 30.0  # seconds before a slow order_send is logged; its outcome is still awaited
+    
+    # Market data backend: "mt5" (terminal, Windows only) or "simulator"
+    MARKET_DATA_BACKEND: str = "mt5"
+    SIMULATOR_SEED: int = 42
+    SIMULATOR_VOLATILITY: float = 0.0001  # per-tick log-return standard deviation
+    SIMULATOR_SPREAD_POINTS: int = 20
+    SIMULATOR_SLIPPAGE_POINTS: int = 0  # max adverse slippage per fill
+    SIMULATOR_FILL_LATENCY_MS: float = 0.0
+    SIMULATOR_TICK_LATENCY_MS: float = 0.0
+    SIMULATOR_REPLAY_FILE: Optional[str] = None  # CSV: symbol,time,bid,ask[,volume]
+    
+    # Multi-worker: one `python -m services.price_feed` process publishes quotes to shared memory
+    PRICE_BOARD_ENABLED: bool = False  # read quotes from the board instead of the market backend
+    PRICE_BOARD_NAME: str = "forex_price_board"
+    PRICE_BOARD_SPECS_FILE: str = "price_board_specs.json"  # symbol specs the feed read from the terminal, loaded by every worker
+    
+    # Leader election: trigger execution, margin monitoring and candle writes run in one worker
+    LEADER_ELECTION_ENABLED: bool = True
+    LEADER_LOCK_ID: int = 7_302_114_001  # pg advisory lock key
+    LEADER_CHECK_INTERVAL: float = 2.0  # seconds between lock attempts / liveness checks
+    TRIGGER_RESYNC_INTERVAL: float = 60.0  # seconds between leader rebuilds of the trigger indexes (safety net for missed events)
+    
+    # Event bus: "local" (single process) or "postgres" (LISTEN/NOTIFY across workers and nodes)
+    EVENT_BUS_BACKEND: str = "local"
+    EVENT_BUS_CHANNEL: str = "forex_events"
+    EVENT_BUS_MAX_PENDING: int = 10000  # outgoing events queued while Postgres is unreachable
+    
+    # WebSocket fan-out: every client has its own bounded send queue and writer task
+    WS_SEND_QUEUE_SIZE: int = 256  # frames queued per client before price frames are dropped
+    WS_SLOW_CONSUMER_TIMEOUT: float = 10.0  # seconds a client may keep its queue full before it is disconnected
+    WS_CANDLE_SNAPSHOT_SIZE: int = 200  # bars in the snapshot sent on subscribing to a candle topic
     
     # Trading
     SYMBOLS: list = ["EURUSD", "USDJPY", "XAUUSD"]
+    PRICE_POLL_MIN_INTERVAL: float = 0.05  # seconds, used while ticks keep changing
+    PRICE_POLL_MAX_INTERVAL: float = 1.0  # seconds, backed off to while the market is quiet
+    SYMBOL_SPECS_FILE: Optional[str] = None  # JSON overrides for contract size, point value, pips, ...
+    CANDLE_HISTORY_SIZE: int = 1000  # bars kept in memory per symbol and timeframe
+    CANDLE_PERSIST_ENABLED: bool = True  # write closed bars to the candles table
+    CANDLE_FLUSH_INTERVAL: float = 5.0  # seconds between batched COPY writes
+    CANDLE_MAX_PENDING: int = 100000  # queued bars kept while the database is unreachable
+    CANDLE_MAX_FLUSH_ATTEMPTS: int = 5  # writes the database may reject before a batch is dropped
+    TICK_RECORDER_ENABLED: bool = False  # append every processed tick to binary day files
+    TICK_RECORD_DIR: str = "ticks"
+    TICK_RECORD_FLUSH_INTERVAL: float = 1.0  # seconds between batched writes + fsync
     DEFAULT_LEVERAGE: int = 100
+    MARGIN_CALL_LEVEL: float = 50.0  # margin level (%) that triggers a margin call notification
+    MARGIN_STOP_OUT_LEVEL: float = 20.0  # margin level (%) at which every position is closed
+    POSITION_RECONCILE_INTERVAL: int = 300  # seconds between position cache reconciliation passes
+    POSITION_STREAM_INCLUDE_ACCOUNT: bool = True  # add equity/margin level to positions_update frames
     
     # Environment
     ENVIRONMENT: str = "development"
@@ -109,12 +109,14 @@ import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
 from services.price_service import PriceService
 from services.trade_service import TradeService , MarginCallService
-from database import create_tables, get_database 
 from database import create_tables
 import asyncio 
 import logging  
-from sqlalchemy import select, and_
-from database import async_session
+from services.metrics import get_metrics
+from services.mt5_gateway import gateway
+from services.leader_election import leader
+from services.event_bus import event_bus
+from config import settings
 
 logger = logging.getLogger(__name__)
 # Initialize services
@@ -125,34 +127,27 @@ logging.getLogger("sqlalchemy.engine").setLevel(logging.WARNING)
 
 # ✅ FIXED: Set the trade service reference in price service for order monitoring
 price_service.set_trade_service(trade_service)
-from models.trade import Trade, TradeStatus, OrderType
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await create_tables()
+    await event_bus.start()
     await price_service.start_price_feed()
-    async with async_session() as db:
-        result = await db.execute(
-            select(Trade).where(
-                and_(
-                    Trade.status == TradeStatus.PENDING,
-                    Trade.order_type == OrderType.LIMIT
-                )
-            )
-        )
-        trades = result.scalars().all()
-        for trade in trades:
-            logger.info(f"✅ Loaded pending: {trade.ticket} - {trade.symbol} - ID: {trade.id}")
-            trade_service.pending_limit_orders[trade.ticket] = trade
-
-
-    margin_task = asyncio.create_task(margin_monitoring_task())
+    # Only the elected leader executes triggers; it (re)builds the indexes on election
+    leader.on_elected(on_elected_leader)
+    leader.on_demoted(on_demoted_leader)
+    await leader.start()
+
+    resync_task = asyncio.create_task(trigger_resync_task())
 
     yield
     # Shutdown
-    margin_task.cancel()
-    await price_service.mt5_service.disconnect()
+    resync_task.cancel()
+    await leader.stop()
+    await price_service.stop_price_feed()
+    await event_bus.stop()
+    gateway.shutdown()
 
 app = FastAPI(
     title="Trading Platform API",
@@ -174,37 +169,49 @@ app.add_middleware(
 app.state.price_service = price_service
 app.state.trade_service = trade_service
 margin_service = MarginCallService(trade_service)
+app.state.margin_service = margin_service
+# Margin levels are checked by the price loop on every tick; the leader liquidates
+price_service.set_margin_service(margin_service)
 
-async def margin_monitoring_task():
+async def trigger_resync_task():
+    """Leader only: pick up limit orders and SL/TP changes made in other workers"""
     while True:
+        await asyncio.sleep(settings.TRIGGER_RESYNC_INTERVAL)
         try:
-            async for db in get_database():
-                await margin_service.monitor_margin_levels(db)
-                break
+            if leader.is_leader:
+                await trade_service.load_trigger_indexes()
         except Exception as e:
-            logger.error(f"Margin monitoring error: {e}")
-        await asyncio.sleep(30)  # Check every 30 seconds
+            logger.error(f"Trigger index resync error: {e}")
 
+async def on_elected_leader():
+    await trade_service.load_trigger_indexes()
+    logger.info(f"✅ Indexed {len(trade_service.pending_limit_orders)} pending limit orders and open position SL/TP")
 
-# In your lifespan function, add:
-# margin_task = asyncio.create_task(margin_monitoring_task())
+async def on_demoted_leader():
+    trade_service.clear_trigger_indexes()
 
 
 # ✅ Import and include routers AFTER setting up app and services
-from routers import auth, users, trades, admin
+from routers import auth, users, trades, admin, prices
 from websocket.manager import websocket_endpoint
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/users", tags=["Users"])
 app.include_router(trades.router, prefix="/api/trades", tags=["Trading"])
 app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
+app.include_router(prices.router, prefix="/api/prices", tags=["Prices"])
 
 # WebSocket route
 app.websocket("/ws")(websocket_endpoint)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "leader": leader.status()}
+
+@app.get("/metrics")
+async def metrics():
+    """Latency histograms (trigger execution, etc.)"""
+    return get_metrics()
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, Float, DateTime, Integer
+from database import Base
+
+class Candle(Base):
+    """Closed OHLC bars, range-partitioned by month on open_time (see services/candle_writer.py)"""
+    __tablename__ = "candles"
+    __table_args__ = {"postgresql_partition_by": "RANGE (open_time)"}
+    
+    # The primary key doubles as the (symbol, timeframe, open_time) range-query index
+    symbol = Column(String(10), primary_key=True)
+    timeframe = Column(String(4), primary_key=True)
+    open_time = Column(DateTime(timezone=True), primary_key=True)
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(Float, default=0.0)
+    tick_count = Column(Integer, default=0)
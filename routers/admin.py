@@ -636,6 +636,11 @@ async def update_user_profile(
     await db.commit()
     await db.refresh(user)
     
+    if update_data.balance is not None:
+        # Margin levels and stop-outs in every worker use the new balance
+        from main import app
+        app.state.price_service.update_account_balance(str(user.id), user.balance)
+    
     return user
 
 @router.post("/users/{user_id}/reset-password")
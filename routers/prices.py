@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, and_
+from typing import List, Optional
+from datetime import datetime
+import logging
+
+from database import get_database
+from models.user import User
+from models.candle import Candle
+from schemas.trade import CandleResponse
+from dependencies import get_current_user
+from services.candle_service import TIMEFRAMES
+from config import settings
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+def _validate_candle_topic(symbol: str, timeframe: str):
+    if symbol not in settings.SYMBOLS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Symbol {symbol} not supported"
+        )
+    if timeframe not in TIMEFRAMES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Timeframe must be one of {', '.join(TIMEFRAMES)}"
+        )
+
+@router.get("/candles", response_model=List[CandleResponse])
+async def get_candles(
+    symbol: str,
+    timeframe: str = Query("M1"),
+    limit: int = Query(500, ge=1, le=settings.CANDLE_HISTORY_SIZE),
+    current_user: User = Depends(get_current_user)
+):
+    """Get the most recent OHLC candles for a symbol, oldest first"""
+    from main import app
+    price_service = app.state.price_service
+    
+    _validate_candle_topic(symbol, timeframe)
+    return price_service.get_candles(symbol, timeframe, limit)
+
+@router.get("/candles/history", response_model=List[CandleResponse])
+async def get_candle_history(
+    symbol: str,
+    start: datetime,
+    end: Optional[datetime] = None,
+    timeframe: str = Query("M1"),
+    limit: int = Query(5000, ge=1, le=50000),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_database)
+):
+    """Get persisted closed candles with start <= open_time < end, oldest first"""
+    _validate_candle_topic(symbol, timeframe)
+    
+    conditions = [
+        Candle.symbol == symbol,
+        Candle.timeframe == timeframe,
+        Candle.open_time >= start
+    ]
+    if end is not None:
+        conditions.append(Candle.open_time < end)
+    
+    result = await db.execute(
+        select(Candle).where(and_(*conditions)).order_by(Candle.open_time).limit(limit)
+    )
+    
+    return [
+        CandleResponse(
+            open_time=int(candle.open_time.timestamp() * 1000),
+            open=candle.open,
+            high=candle.high,
+            low=candle.low,
+            close=candle.close,
+            volume=candle.volume,
+            tick_count=candle.tick_count
+        )
+        for candle in result.scalars().all()
+    ]
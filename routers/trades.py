@@ -11,6 +11,7 @@ from models.user import User
 from models.trade import Trade, TradeStatus
 from schemas.trade import TradeCreate, TradeResponse, PositionResponse
 from dependencies import get_current_user
+from services.price_service import OrderEvent
 from config import settings
 
 logger = logging.getLogger(__name__)
@@ -366,24 +367,8 @@ async def get_pending_orders(
 ):
     """Get user's pending limit orders"""
     from main import app
-    trade_service = app.state.trade_service
-    
-    user_pending = []
-    for ticket, trade in trade_service.pending_limit_orders.items():
-        if trade.users_id == current_user.id:
-            user_pending.append({
-                "id": str(trade.id),
-                "ticket": trade.ticket,
-                "symbol": trade.symbol,
-                "user_type": trade.user_type.value,
-                "volume": float(trade.volume),
-                "target_price": float(trade.entry_price),
-                "stop_loss": float(trade.stop_loss) if trade.stop_loss else None,
-                "take_profit": float(trade.take_profit) if trade.take_profit else None,
-                "status": "PENDING"
-            })
-    
-    return user_pending
+    # From the database: only the leader worker keeps pending orders in memory
+    return await app.state.trade_service.get_pending_orders(db, current_user.id)
 
 
 class TradeUpdateRequest(BaseModel):
@@ -399,6 +384,9 @@ async def update_trade(
     db: AsyncSession = Depends(get_database)
 ):
     """Update stop loss and take profit for existing position"""
+    from main import app
+    trade_service = app.state.trade_service
+    
     result = await db.execute(
         select(Trade).where(
             and_(
@@ -414,13 +402,7 @@ async def update_trade(
         raise HTTPException(status_code=404, detail="Position not found")
     
     # Update SL/TP
-    if update.stop_loss is not None:
-        trade.stop_loss = update.stop_loss
-    if update.take_profit is not None:
-        trade.take_profit = update.take_profit
-    
-    await db.commit()
-    await db.refresh(trade)
+    await trade_service.update_trade_levels(db, trade, update.stop_loss, update.take_profit)
     
     return {"message": "Position updated successfully"}
 
@@ -442,7 +424,7 @@ async def cancel_pending_order(
                 Trade.users_id == current_user.id,
                 Trade.status == TradeStatus.PENDING
             )
-        )
+        ).with_for_update()  # serializes with the leader filling the same order
     )
     trade = result.scalar_one_or_none()
     
@@ -453,9 +435,8 @@ async def cancel_pending_order(
         )
     
     try:
-        # Remove from pending in-memory dict
-        if trade.ticket in trade_service.pending_limit_orders:
-            del trade_service.pending_limit_orders[trade.ticket]
+        # Remove from pending in-memory dict and trigger index
+        if trade_service.untrack_pending_order(trade.ticket):
             logger.info(f"Removed pending order {trade.ticket} from monitoring")
 
         # Update trade status
@@ -477,6 +458,11 @@ async def cancel_pending_order(
 
         await db.commit()
         await db.refresh(trade)
+        trade_service.publish_trade_changed(trade)
+        app.state.price_service.update_account_balance(str(user.id), user.balance)
+        app.state.price_service.publish_order_event(
+            OrderEvent.CANCELLED, str(trade.users_id), trade_service.pending_order_payload(trade)
+        )
 
         logger.info(f"Pending order cancelled: {trade.ticket}, Refunded: ${total_refund:.2f}")
 
@@ -54,3 +54,12 @@ class PriceUpdate(BaseModel):
     ask: float
     timestamp: datetime
 
+
+class CandleResponse(BaseModel):
+    open_time: int  # epoch milliseconds, UTC
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    tick_count: int
@@ -0,0 +1,129 @@
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# Timeframe name -> bar length in seconds; bars are aligned to the UTC epoch
+TIMEFRAMES: Dict[str, int] = {
+    "M1": 60,
+    "M5": 300,
+    "M15": 900,
+    "H1": 3600,
+    "D1": 86400,
+}
+
+
+class CandleSeries:
+    """
+    Fixed-size ring of OHLC bars for one symbol and timeframe.
+
+    Columns are preallocated lists indexed by ring slot, so a tick either
+    updates the current bar in place or starts a new one over the oldest
+    slot: O(1) with no allocation beyond the returned closed bar.
+    """
+
+    __slots__ = ("period_ms", "capacity", "head", "count",
+                 "open_time", "open", "high", "low", "close", "volume", "tick_count")
+
+    def __init__(self, seconds: int, capacity: int):
+        self.period_ms = seconds * 1000
+        self.capacity = capacity
+        self.head = -1  # slot of the forming bar
+        self.count = 0
+        self.open_time = [0] * capacity
+        self.open = [0.0] * capacity
+        self.high = [0.0] * capacity
+        self.low = [0.0] * capacity
+        self.close = [0.0] * capacity
+        self.volume = [0.0] * capacity
+        self.tick_count = [0] * capacity
+
+    def update(self, time_msc: int, price: float, volume: float) -> Optional[Dict]:
+        """Apply one tick; returns the bar it closed, if any"""
+        open_time = time_msc - time_msc % self.period_ms
+        i = self.head
+
+        if self.count:
+            current_open = self.open_time[i]
+            if open_time == current_open:
+                if price > self.high[i]:
+                    self.high[i] = price
+                elif price < self.low[i]:
+                    self.low[i] = price
+                self.close[i] = price
+                self.volume[i] += volume
+                self.tick_count[i] += 1
+                return None
+            if open_time < current_open:
+                # Late tick for a bar that is already closed
+                return None
+
+        closed = self._candle(i) if self.count else None
+
+        i = (i + 1) % self.capacity
+        self.head = i
+        self.count = min(self.count + 1, self.capacity)
+        self.open_time[i] = open_time
+        self.open[i] = self.high[i] = self.low[i] = self.close[i] = price
+        self.volume[i] = volume
+        self.tick_count[i] = 1
+        return closed
+
+    def _candle(self, i: int) -> Dict:
+        return {
+            "open_time": self.open_time[i],
+            "open": self.open[i],
+            "high": self.high[i],
+            "low": self.low[i],
+            "close": self.close[i],
+            "volume": self.volume[i],
+            "tick_count": self.tick_count[i]
+        }
+
+    def current(self) -> Optional[Dict]:
+        """The forming bar"""
+        return self._candle(self.head) if self.count else None
+
+    def latest(self, limit: int) -> List[Dict]:
+        """Up to limit most recent bars, oldest first, the forming bar last"""
+        limit = min(limit, self.count)
+        start = self.head - limit + 1
+        return [self._candle(slot % self.capacity) for slot in range(start, self.head + 1)]
+
+
+class CandleAggregator:
+    """M1/M5/M15/H1/D1 bid candles for every symbol, built incrementally from ticks"""
+
+    def __init__(self, capacity: int = settings.CANDLE_HISTORY_SIZE):
+        self.capacity = capacity
+        self.series: Dict[str, Dict[str, CandleSeries]] = {}  # symbol -> timeframe -> bars
+
+    def _series_for(self, symbol: str) -> Dict[str, CandleSeries]:
+        series = self.series.get(symbol)
+        if series is None:
+            series = self.series[symbol] = {
+                timeframe: CandleSeries(seconds, self.capacity) for timeframe, seconds in TIMEFRAMES.items()
+            }
+        return series
+
+    def update(self, symbol: str, time_msc: int, price: float, volume: float = 0.0) -> List[Tuple[str, Dict]]:
+        """Apply one tick to every timeframe; returns (timeframe, bar) for bars it closed"""
+        closed = []
+        for timeframe, series in self._series_for(symbol).items():
+            bar = series.update(time_msc, price, volume)
+            if bar is not None:
+                closed.append((timeframe, bar))
+        return closed
+
+    def current(self, symbol: str, timeframe: str) -> Optional[Dict]:
+        series = self.series.get(symbol)
+        return series[timeframe].current() if series else None
+
+    def get_candles(self, symbol: str, timeframe: str, limit: int = 500) -> List[Dict]:
+        """Most recent bars for a symbol and timeframe, oldest first"""
+        series = self.series.get(symbol)
+        if not series:
+            return []
+        return series[timeframe].latest(limit)
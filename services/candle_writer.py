@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from database import engine
+from models.candle import Candle  # noqa: F401  (registers the table for create_tables)
+from services.metrics import get_histogram, increment
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ["symbol", "timeframe", "open_time", "open", "high", "low", "close", "volume", "tick_count"]
+
+UPSERT_FROM_STAGING = """
+    INSERT INTO candles SELECT * FROM candles_staging
+    ON CONFLICT (symbol, timeframe, open_time) DO UPDATE SET
+        open = EXCLUDED.open,
+        high = EXCLUDED.high,
+        low = EXCLUDED.low,
+        close = EXCLUDED.close,
+        volume = EXCLUDED.volume,
+        tick_count = EXCLUDED.tick_count
+"""
+
+
+def _month_start(year: int, month: int) -> str:
+    """Partition bound in UTC, whatever the session TimeZone; months are computed from UTC bar times"""
+    return f"{year:04d}-{month:02d}-01 00:00+00"
+
+
+class CandleWriter:
+    """
+    Persists closed candles to the month-partitioned candles table.
+
+    enqueue() is a plain deque append for the tick path. A background task
+    drains the queue every CANDLE_FLUSH_INTERVAL seconds and writes the whole
+    batch with one COPY into a temporary staging table followed by an upsert,
+    so replays and restarts can rewrite bars without conflicts. The queue is
+    bounded by CANDLE_MAX_PENDING; while the database is unreachable the oldest
+    bars are dropped first. A batch the database keeps rejecting is dropped
+    after CANDLE_MAX_FLUSH_ATTEMPTS so it cannot stall every later bar.
+    """
+
+    def __init__(self, flush_interval: float = settings.CANDLE_FLUSH_INTERVAL,
+                 max_pending: int = settings.CANDLE_MAX_PENDING,
+                 max_attempts: int = settings.CANDLE_MAX_FLUSH_ATTEMPTS):
+        self.flush_interval = flush_interval
+        self.pending: Deque[Tuple] = deque(maxlen=max_pending)
+        self.partitions: Set[Tuple[int, int]] = set()  # (year, month) partitions known to exist
+        self.max_attempts = max_attempts
+        self.failed_attempts = 0  # consecutive rejections of the batch at the front of the queue
+        self._task: Optional[asyncio.Task] = None
+
+    def enqueue(self, symbol: str, timeframe: str, candle: Dict):
+        """Queue one closed bar; never awaits"""
+        if len(self.pending) == self.pending.maxlen:
+            increment("candles.dropped")
+        self.pending.append((
+            symbol,
+            timeframe,
+            datetime.fromtimestamp(candle["open_time"] / 1000, tz=timezone.utc),
+            candle["open"],
+            candle["high"],
+            candle["low"],
+            candle["close"],
+            candle["volume"],
+            candle["tick_count"]
+        ))
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush task and write out whatever is still queued"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Shielded so shutdown cannot cancel a batch halfway through
+            await asyncio.shield(self.flush())
+
+    async def flush(self):
+        """Write every queued bar in one COPY"""
+        if not self.pending:
+            return
+        records = list(self.pending)
+        self.pending.clear()
+
+        started = time.perf_counter()
+        connected = False
+        try:
+            async with engine.connect() as conn:
+                raw = await conn.get_raw_connection()
+                connection = raw.driver_connection  # asyncpg, for COPY
+                connected = True
+                async with connection.transaction():
+                    months = await self._ensure_partitions(connection, records)
+                    await connection.execute(
+                        "CREATE TEMP TABLE candles_staging (LIKE candles INCLUDING DEFAULTS) ON COMMIT DROP"
+                    )
+                    await connection.copy_records_to_table("candles_staging", records=records, columns=COLUMNS)
+                    await connection.execute(UPSERT_FROM_STAGING)
+        except Exception as e:
+            logger.error(f"Failed to write {len(records)} candles: {e}")
+            # Only rejections by a reachable database count; an outage is retried for as long as the queue lasts
+            if connected:
+                self.failed_attempts += 1
+            if self.failed_attempts >= self.max_attempts:
+                logger.error(
+                    f"Dropping {len(records)} candles ({records[0][2]} .. {records[-1][2]}) "
+                    f"after {self.failed_attempts} rejected writes"
+                )
+                increment("candles.dropped", len(records))
+                self.failed_attempts = 0
+                return
+            # Retry with the next batch; the bounded queue keeps the newest bars
+            self.pending = deque(records + list(self.pending), maxlen=self.pending.maxlen)
+            return
+
+        self.failed_attempts = 0
+        self.partitions |= months
+        get_histogram("candles.flush").observe((time.perf_counter() - started) * 1000)
+        increment("candles.written", len(records))
+
+    async def _ensure_partitions(self, connection, records: List[Tuple]) -> Set[Tuple[int, int]]:
+        """Create the monthly partitions the batch needs; returns the months created"""
+        months = {(record[2].year, record[2].month) for record in records} - self.partitions
+        for year, month in sorted(months):
+            next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+            await connection.execute(
+                f"CREATE TABLE IF NOT EXISTS candles_{year:04d}_{month:02d} PARTITION OF candles "
+                f"FOR VALUES FROM ('{_month_start(year, month)}') TO ('{_month_start(next_year, next_month)}')"
+            )
+        return months
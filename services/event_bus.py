@@ -0,0 +1,165 @@
+import asyncio
+import inspect
+import json
+import logging
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import asyncpg
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+Handler = Callable[[Dict], Any]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+
+
+class EventBus:
+    """
+    In-process pub/sub for trade, position and account events.
+
+    publish() is synchronous: plain handlers run before it returns and
+    coroutine handlers are scheduled as tasks, so the tick path never awaits
+    a consumer. Every process handles each event once, including the
+    publisher; pass remote_only=True when the publisher has already applied
+    the event itself. Payloads must be JSON-serializable so the same events
+    can cross process boundaries (PostgresEventBus).
+    """
+
+    def __init__(self):
+        self.handlers: Dict[str, List[Handler]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    def subscribe(self, topic: str, handler: Handler):
+        self.handlers.setdefault(topic, []).append(handler)
+
+    def publish(self, topic: str, data: Dict, remote_only: bool = False):
+        if not remote_only:
+            self._dispatch(topic, data)
+
+    def _dispatch(self, topic: str, data: Dict):
+        for handler in self.handlers.get(topic, ()):
+            try:
+                result = handler(data)
+                if inspect.isawaitable(result):
+                    task = asyncio.ensure_future(result)
+                    self._tasks.add(task)
+                    task.add_done_callback(self._task_done)
+            except Exception as e:
+                logger.error(f"Event handler for {topic} failed: {e}")
+
+    def _task_done(self, task: asyncio.Task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Event handler task failed: {task.exception()}")
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+
+class PostgresEventBus(EventBus):
+    """
+    EventBus that also fans events out to every other worker and node through
+    Postgres LISTEN/NOTIFY on EVENT_BUS_CHANNEL.
+
+    Outgoing events are queued and sent by a background task on a dedicated
+    connection; a second connection LISTENs and dispatches events from other
+    processes (each process tags its events with a random origin id and skips
+    its own). Both connections are re-established if they drop; an event
+    whose NOTIFY fails only reaches the local process.
+    """
+
+    def __init__(self, channel: str = settings.EVENT_BUS_CHANNEL):
+        super().__init__()
+        self.channel = channel
+        self.origin = uuid.uuid4().hex
+        self.outgoing: asyncio.Queue = asyncio.Queue(maxsize=settings.EVENT_BUS_MAX_PENDING)
+        self._listen_conn = None
+        self._sender_task: Optional[asyncio.Task] = None
+        self._listener_task: Optional[asyncio.Task] = None
+
+    def publish(self, topic: str, data: Dict, remote_only: bool = False):
+        super().publish(topic, data, remote_only)
+        payload = json.dumps({"origin": self.origin, "topic": topic, "data": data}, default=str)
+        if len(payload.encode()) > MAX_NOTIFY_PAYLOAD:
+            logger.error(f"Event {topic} too large for NOTIFY ({len(payload)} bytes), delivered locally only")
+            return
+        try:
+            self.outgoing.put_nowait(payload)
+        except asyncio.QueueFull:
+            logger.error(f"Event bus queue full, dropping {topic} for other workers")
+
+    async def _connect(self) -> asyncpg.Connection:
+        return await asyncpg.connect(settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://"))
+
+    async def start(self):
+        if self._sender_task is None:
+            self._sender_task = asyncio.create_task(self._send_loop())
+            self._listener_task = asyncio.create_task(self._listen_loop())
+
+    async def stop(self):
+        for task in (self._sender_task, self._listener_task):
+            if task is not None:
+                task.cancel()
+        self._sender_task = self._listener_task = None
+        if self._listen_conn is not None:
+            await self._listen_conn.close()
+            self._listen_conn = None
+
+    async def _send_loop(self):
+        conn = None
+        while True:
+            payload = await self.outgoing.get()
+            try:
+                if conn is None or conn.is_closed():
+                    conn = await self._connect()
+                await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event bus publish failed: {e}")
+                conn = None
+                await asyncio.sleep(1)
+
+    async def _listen_loop(self):
+        while True:
+            try:
+                if self._listen_conn is None or self._listen_conn.is_closed():
+                    self._listen_conn = await self._connect()
+                    await self._listen_conn.add_listener(self.channel, self._on_notify)
+                    logger.info(f"✅ Event bus listening on {self.channel}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event bus listen failed: {e}")
+                self._listen_conn = None
+            await asyncio.sleep(5)
+
+    def _on_notify(self, connection, pid, channel, payload: str):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.error(f"Malformed event on {channel}")
+            return
+        if event.get("origin") == self.origin:
+            return
+        self._dispatch(event["topic"], event["data"])
+
+
+def create_event_bus() -> EventBus:
+    """Bus selected by EVENT_BUS_BACKEND ("local" or "postgres")"""
+    if settings.EVENT_BUS_BACKEND == "postgres":
+        return PostgresEventBus()
+    if settings.EVENT_BUS_BACKEND == "local":
+        return EventBus()
+    raise ValueError(f"Unknown EVENT_BUS_BACKEND: {settings.EVENT_BUS_BACKEND}")
+
+
+# One bus per process, shared by PriceService, TradeService and ConnectionManager
+event_bus = create_event_bus()
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from config import settings
+from database import engine
+
+logger = logging.getLogger(__name__)
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class LeaderElector:
+    """
+    Elects one worker process to run the singleton background work (trigger
+    execution, margin monitoring, candle persistence) via a Postgres
+    session-level advisory lock.
+
+    Every worker keeps trying pg_try_advisory_lock on a dedicated connection.
+    The holder stays leader while that connection is alive; if the process or
+    its connection dies, Postgres releases the lock and another worker takes
+    over on its next attempt, within LEADER_CHECK_INTERVAL seconds. With
+    LEADER_ELECTION_ENABLED off the process is always the leader.
+    """
+
+    def __init__(self, lock_id: int = settings.LEADER_LOCK_ID, interval: float = settings.LEADER_CHECK_INTERVAL):
+        self.enabled = settings.LEADER_ELECTION_ENABLED
+        self.lock_id = lock_id
+        self.interval = interval
+        self.is_leader = not self.enabled
+        self.leader_since: Optional[datetime] = None
+        self._conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._elected_callbacks: List[Callback] = []
+        self._demoted_callbacks: List[Callback] = []
+
+    def on_elected(self, callback: Callback):
+        self._elected_callbacks.append(callback)
+
+    def on_demoted(self, callback: Callback):
+        self._demoted_callbacks.append(callback)
+
+    async def start(self):
+        """Start campaigning; without election the callbacks run right away"""
+        if not self.enabled:
+            self.leader_since = datetime.now()
+            await self._run_callbacks(self._elected_callbacks)
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop campaigning and release the lock"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self._close_connection()
+        if self.enabled:
+            self.is_leader = False
+            self.leader_since = None
+
+    async def _run(self):
+        while True:
+            try:
+                if self.is_leader:
+                    # The lock lives exactly as long as this session
+                    await self._conn.execute(text("SELECT 1"))
+                else:
+                    await self._try_acquire()
+            except Exception as e:
+                logger.error(f"Leader election error: {e}")
+                await self._demote()
+            await asyncio.sleep(self.interval)
+
+    async def _try_acquire(self):
+        if self._conn is None:
+            # Autocommit so the campaigning session never sits idle in a transaction
+            self._conn = await engine.execution_options(isolation_level="AUTOCOMMIT").connect()
+        result = await self._conn.execute(text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id})
+        if result.scalar():
+            self.is_leader = True
+            self.leader_since = datetime.now()
+            logger.info(f"✅ Worker {os.getpid()} elected leader")
+            await self._run_callbacks(self._elected_callbacks)
+
+    async def _demote(self):
+        was_leader = self.is_leader
+        self.is_leader = False
+        self.leader_since = None
+        await self._close_connection()
+        if was_leader:
+            logger.warning(f"Worker {os.getpid()} lost leadership")
+            await self._run_callbacks(self._demoted_callbacks)
+
+    async def _close_connection(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.close()
+        except Exception as e:
+            logger.debug(f"Closing leader connection failed: {e}")
+        self._conn = None
+
+    async def _run_callbacks(self, callbacks: List[Callback]):
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Leadership callback {getattr(callback, '__name__', callback)} failed: {e}")
+
+    def status(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "is_leader": self.is_leader,
+            "leader_since": self.leader_since.isoformat() if self.leader_since else None,
+            "worker_pid": os.getpid()
+        }
+
+
+# One election per process, shared by the services and main.py
+leader = LeaderElector()
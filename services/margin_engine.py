@@ -0,0 +1,198 @@
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def account_figures(balance: float, margin_used: float, unrealized_pnl: float) -> Dict:
+    """Equity, free margin and margin level of an account, as REST /account and the account stream report them"""
+    equity = balance + margin_used + unrealized_pnl
+    return {
+        "balance": round(balance, 2),
+        "unrealized_pnl": round(unrealized_pnl, 2),
+        "equity": round(equity, 2),
+        "margin_used": round(margin_used, 2),
+        "free_margin": round(equity - margin_used, 2),
+        "margin_level": round(equity / margin_used * 100, 2) if margin_used > 0 else 0
+    }
+
+
+class MarginEngine:
+    """
+    Per-user equity, used margin and margin level kept in memory and updated
+    incrementally from each tick's P&L.
+
+    Position events adjust used margin, trades and the event bus keep
+    balances current, and update_symbol_pnl() folds one symbol's fresh
+    per-user P&L into each user's running unrealized total as a delta against
+    that symbol's previous figures, so equity never needs a sum over symbols
+    or a database read. The same call checks the touched users against the
+    margin call and stop-out levels.
+
+    Balances are net of the margin locked at open, so equity adds used margin
+    back: equity = balance + margin_used + unrealized P&L, and
+    margin level = equity / margin_used * 100.
+    """
+
+    def __init__(self, margin_call_level: float = settings.MARGIN_CALL_LEVEL,
+                 stop_out_level: float = settings.MARGIN_STOP_OUT_LEVEL):
+        self.margin_call_level = margin_call_level
+        self.stop_out_level = stop_out_level
+        self.balances: Dict[str, float] = {}  # user_id -> balance
+        self.margin_used: Dict[str, float] = {}  # user_id -> sum of margin_required
+        self.position_counts: Dict[str, int] = {}  # user_id -> open positions
+        self.unrealized_pnl: Dict[str, float] = {}  # user_id -> P&L across all symbols
+        self.symbol_pnl: Dict[str, Dict[str, float]] = {}  # symbol -> {user_id: P&L at the last tick}
+        self.margin_called: Set[str] = set()  # below the margin call level, already notified
+        self.stopping_out: Set[str] = set()  # liquidation in progress
+
+    def set_balance(self, user_id: str, balance: float):
+        self.balances[user_id] = balance
+
+    def add_position(self, trade):
+        self._adjust(trade, 1)
+
+    def remove_position(self, trade, last_pnl: float = 0.0):
+        """
+        Drop a closed position's margin and its P&L from the last tick of its symbol,
+        which would otherwise be counted again next to the balance it was realized into
+        """
+        self._adjust(trade, -1)
+        user_id = str(trade.users_id)
+        if last_pnl:
+            pnl = self.symbol_pnl.get(trade.symbol)
+            if pnl is not None and user_id in pnl:
+                pnl[user_id] -= last_pnl
+            if user_id in self.unrealized_pnl:
+                self.unrealized_pnl[user_id] -= last_pnl
+        if user_id not in self.position_counts:
+            # Nothing left at risk; the next position starts from a fresh balance
+            self.balances.pop(user_id, None)
+            self.unrealized_pnl.pop(user_id, None)
+            for pnl in self.symbol_pnl.values():
+                pnl.pop(user_id, None)
+            self.margin_called.discard(user_id)
+
+    def replace_position(self, previous, trade):
+        """
+        Swap in a modified position's margin without the last-position-closed
+        cleanup of remove_position(), which would drop the owner's balance
+        """
+        user_id = str(trade.users_id)
+        if str(previous.users_id) != user_id or user_id not in self.position_counts:
+            self.remove_position(previous)
+            self.add_position(trade)
+            return
+        self.margin_used[user_id] += (trade.margin_required or 0.0) - (previous.margin_required or 0.0)
+
+    def _adjust(self, trade, sign: int):
+        """Add or subtract a position's margin from its owner's totals"""
+        user_id = str(trade.users_id)
+        count = self.position_counts.get(user_id, 0) + sign
+        if count <= 0:
+            self.position_counts.pop(user_id, None)
+            self.margin_used.pop(user_id, None)
+            return
+        self.position_counts[user_id] = count
+        self.margin_used[user_id] = self.margin_used.get(user_id, 0.0) + sign * (trade.margin_required or 0.0)
+
+    def update_symbol_pnl(self, symbol: str, pnl: Dict[str, float]) -> Tuple[List[Tuple[str, float]], List[Tuple[str, float]]]:
+        """
+        Replace a symbol's per-user P&L and check every affected user.
+        Returns (stop_outs, margin_calls) as (user_id, margin_level) pairs;
+        each user is reported once until their level recovers or the
+        liquidation finishes.
+        """
+        previous = self.symbol_pnl.get(symbol, {})
+        if pnl:
+            self.symbol_pnl[symbol] = pnl
+        else:
+            self.symbol_pnl.pop(symbol, None)
+
+        unrealized = self.unrealized_pnl
+        for user_id, value in pnl.items():
+            unrealized[user_id] = unrealized.get(user_id, 0.0) + value - previous.get(user_id, 0.0)
+        for user_id in previous.keys() - pnl.keys():
+            # The user's last position in this symbol closed
+            if user_id in unrealized:
+                unrealized[user_id] -= previous[user_id]
+
+        stop_outs: List[Tuple[str, float]] = []
+        margin_calls: List[Tuple[str, float]] = []
+        for user_id in pnl:
+            level = self.margin_level(user_id)
+            if level is None:
+                continue
+            if level <= self.stop_out_level:
+                if user_id not in self.stopping_out:
+                    self.stopping_out.add(user_id)
+                    stop_outs.append((user_id, level))
+            elif level <= self.margin_call_level:
+                if user_id not in self.margin_called:
+                    self.margin_called.add(user_id)
+                    margin_calls.append((user_id, level))
+            else:
+                self.margin_called.discard(user_id)
+        return stop_outs, margin_calls
+
+    def stop_out_finished(self, user_id: str):
+        """Allow another stop-out once a liquidation ends (a failed one is retried on the next tick)"""
+        self.stopping_out.discard(user_id)
+
+    def reconcile(self, accounts: Dict[str, Tuple[float, float, int]], skip: Set[str] = frozenset()) -> int:
+        """
+        Seed balances and repair used margin and position counts from the
+        database's (balance, margin_used, position_count) per user. Users in
+        skip changed while the query ran, so their in-memory state is newer.
+        Returns how many users had drifted.
+        """
+        drift = 0
+        for user_id, (balance, margin_used, count) in accounts.items():
+            if user_id in skip:
+                continue
+            self.balances[user_id] = balance
+            if self.position_counts.get(user_id) != count or abs(self.margin_used.get(user_id, 0.0) - margin_used) > 0.01:
+                drift += 1
+                self.position_counts[user_id] = count
+                self.margin_used[user_id] = margin_used
+
+        for user_id in self.position_counts.keys() - accounts.keys() - skip:
+            drift += 1
+            del self.position_counts[user_id]
+            self.margin_used.pop(user_id, None)
+            self.balances.pop(user_id, None)
+        return drift
+
+    def resync_unrealized(self):
+        """Recompute running totals from the per-symbol figures, dropping accumulated rounding drift"""
+        totals: Dict[str, float] = {}
+        for pnl in self.symbol_pnl.values():
+            for user_id, value in pnl.items():
+                totals[user_id] = totals.get(user_id, 0.0) + value
+        self.unrealized_pnl = totals
+
+    def margin_level(self, user_id: str) -> Optional[float]:
+        """Current margin level in percent, or None without a balance or open margin"""
+        balance = self.balances.get(user_id)
+        margin_used = self.margin_used.get(user_id, 0.0)
+        if balance is None or margin_used <= 0:
+            return None
+        equity = balance + margin_used + self.unrealized_pnl.get(user_id, 0.0)
+        return equity / margin_used * 100
+
+    def snapshot(self, user_id: str) -> Optional[Dict]:
+        """Account figures for the position stream, or None if the balance is unknown"""
+        balance = self.balances.get(user_id)
+        if balance is None:
+            return None
+
+        return account_figures(balance, self.margin_used.get(user_id, 0.0), self.unrealized_pnl.get(user_id, 0.0))
+
+    def get_stats(self) -> Dict:
+        return {
+            "accounts": len(self.position_counts),
+            "margin_called": len(self.margin_called),
+            "stopping_out": len(self.stopping_out)
+        }
@@ -0,0 +1,69 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, Any, List
+import logging
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MarketDataBackend(ABC):
+    """
+    Interface behind MT5Service: quotes and market order execution.
+
+    Implementations: TerminalBackend (MetaTrader 5 terminal, Windows only) and
+    SimulatorBackend (deterministic random-walk or replayed ticks).
+    """
+
+    connected: bool = False
+
+    @abstractmethod
+    async def connect(self) -> bool:
+        """Open the session to the quote source, returns False if it is unavailable"""
+
+    @abstractmethod
+    async def disconnect(self):
+        """Close the session"""
+
+    @abstractmethod
+    async def place_order(self, symbol: str, order_type: str, volume: float,
+                          price: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Execute a market order, returns ticket/price/volume/retcode/comment or None"""
+
+    @abstractmethod
+    async def close_position(self, ticket: str, symbol: str, volume: float,
+                             position_type: str) -> Optional[Dict[str, Any]]:
+        """Close a position with an opposite market order"""
+
+    @abstractmethod
+    async def get_symbol_price(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Latest tick as bid/ask/time/time_msc/volume, or None"""
+
+    async def get_symbol_info(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Contract size, point and digits for a symbol, or None to keep the registry defaults"""
+        return None
+
+    async def get_symbol_prices(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """Latest ticks for many symbols; backends override this with a single batched call"""
+        ticks = await asyncio.gather(*(self.get_symbol_price(symbol) for symbol in symbols))
+        return {symbol: tick for symbol, tick in zip(symbols, ticks) if tick}
+
+
+_backend: Optional[MarketDataBackend] = None
+
+
+def get_market_backend() -> MarketDataBackend:
+    """Process-wide backend selected by MARKET_DATA_BACKEND ("mt5" or "simulator")"""
+    global _backend
+    if _backend is None:
+        if settings.MARKET_DATA_BACKEND == "simulator":
+            from services.simulator_backend import SimulatorBackend
+            _backend = SimulatorBackend()
+        elif settings.MARKET_DATA_BACKEND == "mt5":
+            # Imported lazily: the MetaTrader5 package only exists on Windows
+            from services.terminal_backend import TerminalBackend
+            _backend = TerminalBackend()
+        else:
+            raise ValueError(f"Unknown MARKET_DATA_BACKEND: {settings.MARKET_DATA_BACKEND}")
+        logger.info(f"Market data backend: {settings.MARKET_DATA_BACKEND}")
+    return _backend
@@ -0,0 +1,76 @@
+import bisect
+from typing import Dict, Tuple
+
+DEFAULT_BUCKETS_MS: Tuple[float, ...] = (0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram in milliseconds.
+    observe() is O(log buckets) and allocation free so it can sit on hot paths.
+    """
+
+    def __init__(self, name: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS_MS):
+        self.name = name
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, value_ms: float):
+        self.counts[bisect.bisect_left(self.buckets, value_ms)] += 1
+        self.count += 1
+        self.sum_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile (0 < q <= 1)"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for i, bucket_count in enumerate(self.counts):
+            running += bucket_count
+            if running >= target:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def snapshot(self) -> Dict:
+        buckets = {f"le_{bound:g}": count for bound, count in zip(self.buckets, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "p50_ms": self.percentile(0.50),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "buckets": buckets
+        }
+
+
+_histograms: Dict[str, LatencyHistogram] = {}
+_counters: Dict[str, int] = {}
+
+
+def get_histogram(name: str) -> LatencyHistogram:
+    """Get or create the process-wide histogram with this name"""
+    histogram = _histograms.get(name)
+    if histogram is None:
+        histogram = _histograms[name] = LatencyHistogram(name)
+    return histogram
+
+
+def increment(name: str, amount: int = 1):
+    """Bump a process-wide counter"""
+    _counters[name] = _counters.get(name, 0) + amount
+
+
+def get_metrics() -> Dict[str, Dict]:
+    """Snapshot of every registered histogram and counter"""
+    return {
+        "histograms": {name: histogram.snapshot() for name, histogram in sorted(_histograms.items())},
+        "counters": dict(sorted(_counters.items()))
+    }
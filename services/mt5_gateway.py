@@ -0,0 +1,65 @@
+import asyncio
+import functools
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from config import settings
+from services.metrics import get_histogram, increment
+
+logger = logging.getLogger(__name__)
+
+
+class MT5Gateway:
+    """
+    Runs every MetaTrader5 terminal call on one dedicated worker thread.
+
+    The terminal API is blocking and not thread-safe, so calls are serialized
+    through a single-thread executor (its work queue is the request queue) and
+    the event loop only awaits the response. Each call has a timeout (orders
+    are never abandoned, see call()) and its latency is recorded under
+    mt5.<function name>.
+    """
+
+    def __init__(self, timeout: float = settings.MT5_CALL_TIMEOUT):
+        self.timeout = timeout
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5-gateway")
+        return self._executor
+
+    async def call(self, func: Callable, *args, timeout: Optional[float] = None, abandon: bool = True, **kwargs) -> Any:
+        """
+        Run func(*args, **kwargs) on the terminal thread and await its result.
+        With abandon=False (order_send) a timeout is only logged and the call's real
+        outcome is still awaited: an order reported as failed may have filled.
+        """
+        name = getattr(func, "__name__", "call")
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        future = loop.run_in_executor(self._get_executor(), functools.partial(func, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            # The terminal call itself cannot be interrupted; later calls queue behind it
+            increment(f"mt5.{name}.timeouts")
+            if abandon:
+                logger.error(f"MT5 call {name} timed out after {timeout or self.timeout}s")
+                raise
+            logger.warning(f"MT5 call {name} still running after {timeout or self.timeout}s, waiting for its outcome")
+            return await future
+        finally:
+            get_histogram(f"mt5.{name}").observe((time.perf_counter() - started) * 1000)
+
+    def shutdown(self):
+        """Stop the terminal thread once queued calls have finished"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# One terminal thread per process, shared by every MT5Service instance
+gateway = MT5Gateway()
@@ -152,142 +152,48 @@
 
 # services/mt5_service.py - CORRECTED VERSION
 
-import MetaTrader5 as mt5
-import asyncio
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 import logging
+from services.market_backend import get_market_backend
 
 logger = logging.getLogger(__name__)
 
 class MT5Service:
+    """Market access for PriceService/TradeService, backed by the configured MARKET_DATA_BACKEND"""
+
     def __init__(self):
-        self.connected = False
+        self.backend = get_market_backend()
+    
+    @property
+    def connected(self) -> bool:
+        return self.backend.connected
     
     async def connect(self):
-        """Connect to MetaTrader 5"""
-        if not mt5.initialize():
-            logger.error("MT5 initialization failed")
-            return False
-        
-        self.connected = True
-        logger.info("MT5 connected successfully")
-        return True
+        """Connect to the market data backend"""
+        return await self.backend.connect()
     
     async def disconnect(self):
-        """Disconnect from MetaTrader 5"""
-        mt5.shutdown()
-        self.connected = False
-        logger.info("MT5 disconnected")
+        """Disconnect from the market data backend"""
+        await self.backend.disconnect()
     
     async def place_order(self, symbol: str, order_type: str, volume: float, 
                          price: Optional[float] = None) -> Optional[Dict[str, Any]]:
         """✅ FIXED: Place MARKET order only (no SL/TP parameters accepted)"""
-        if not self.connected:
-            await self.connect()
-        
-        try:
-            # Check symbol availability
-            symbol_info = mt5.symbol_info(symbol)
-            if symbol_info is None:
-                logger.error(f"Symbol {symbol} not found")
-                return None
-            
-            # ✅ FIXED: Only send MARKET orders to MT5
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": symbol,
-                "volume": volume,
-                "type": mt5.ORDER_TYPE_BUY if order_type == "buy" else mt5.ORDER_TYPE_SELL,
-                "deviation": 20,
-                "magic": 123456,
-                "comment": "FastAPI Market Order",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
-            
-            # ✅ REMOVED: No price, sl, tp parameters - only market execution
-            # We handle SL/TP on our backend, not on MT5
-            
-            # Send order
-            result = mt5.order_send(request)
-            
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                logger.error(f"MT5 order failed: {result.comment}")
-                return None
-            
-            logger.info(f"✅ MT5 market order executed: {result.order} at {result.price}")
-            
-            return {
-                "ticket": str(result.order),
-                "price": result.price,
-                "volume": result.volume,
-                "retcode": result.retcode,
-                "comment": result.comment
-            }
-            
-        except Exception as e:
-            logger.error(f"MT5 order placement error: {e}")
-            return None
+        return await self.backend.place_order(symbol, order_type, volume, price)
     
     async def close_position(self, ticket: str, symbol: str, volume: float, 
                            position_type: str) -> Optional[Dict[str, Any]]:
-        """✅ Close position on MT5 (market order for closing)"""
-        if not self.connected:
-            await self.connect()
-        
-        try:
-            # Reverse the position type for closing
-            close_type = mt5.ORDER_TYPE_SELL if position_type == "buy" else mt5.ORDER_TYPE_BUY
-            
-            request = {
-                "action": mt5.TRADE_ACTION_DEAL,
-                "symbol": symbol,
-                "volume": volume,
-                "type": close_type,
-                "position": int(ticket),
-                "deviation": 20,
-                "magic": 123456,
-                "comment": "FastAPI Close",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
-            
-            result = mt5.order_send(request)
-            
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
-                logger.error(f"MT5 close failed: {result.comment}")
-                return None
-            
-            logger.info(f"✅ MT5 position closed: {ticket} at {result.price}")
-            
-            return {
-                "ticket": str(result.order),
-                "price": result.price,
-                "volume": result.volume,
-                "retcode": result.retcode,
-                "comment": result.comment
-            }
-            
-        except Exception as e:
-            logger.error(f"MT5 position close error: {e}")
-            return None
+        """✅ Close position (market order for closing)"""
+        return await self.backend.close_position(ticket, symbol, volume, position_type)
     
     async def get_symbol_price(self, symbol: str) -> Optional[Dict[str, float]]:
         """Get current price for symbol"""
-        if not self.connected:
-            await self.connect()
-        
-        try:
-            tick = mt5.symbol_info_tick(symbol)
-            if tick is None:
-                return None
-            
-            return {
-                "bid": tick.bid,
-                "ask": tick.ask,
-                "time": tick.time,
-                "volume": getattr(tick, 'volume', 0)
-            }
-        except Exception as e:
-            logger.error(f"Price fetch error: {e}")
-            return None
\ No newline at end of file
+        return await self.backend.get_symbol_price(symbol)
+    
+    async def get_symbol_info(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Get contract size, point and digits for symbol"""
+        return await self.backend.get_symbol_info(symbol)
+    
+    async def get_symbol_prices(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """Get current prices for many symbols in one batched backend call"""
+        return await self.backend.get_symbol_prices(symbols)
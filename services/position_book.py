@@ -0,0 +1,146 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+
+from models.trade import Trade, TradeType
+
+
+class PositionBook:
+    """
+    Columnar store of the open positions for a single symbol.
+
+    Each position occupies one row of a set of NumPy arrays so a tick can
+    compute P&L and pips for every position in one vectorized pass.
+    Rows are removed by swapping the last row into the hole, which keeps
+    add/remove O(1) and the arrays dense.
+    """
+
+    def __init__(self, symbol: str, contract_size: float, point_value: float,
+                 pip_multiplier: float, capacity: int = 64):
+        self.symbol = symbol
+        self.contract_size = contract_size
+        self.point_value = point_value
+        self.pip_multiplier = pip_multiplier
+
+        self.size = 0
+        self.entry_price = np.zeros(capacity, dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.float64)
+        self.side = np.zeros(capacity, dtype=np.float64)  # +1 user buy, -1 user sell
+        self.contract_sizes = np.zeros(capacity, dtype=np.float64)
+        self.point_values = np.zeros(capacity, dtype=np.float64)
+        self.last_pnl = np.zeros(capacity, dtype=np.float64)  # unrealized P&L at the last compute()
+
+        self.trades: List[Trade] = []
+        self.user_ids: List[str] = []
+        # Per-row fields of the positions_update stream that do not change with price
+        self.stream_fields: List[Dict] = []
+        self.row_by_id: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, trade_id: str) -> bool:
+        return trade_id in self.row_by_id
+
+    def _grow(self):
+        """Double the capacity of every column"""
+        capacity = max(len(self.entry_price) * 2, 64)
+        for name in ("entry_price", "volume", "side", "contract_sizes", "point_values", "last_pnl"):
+            column = np.zeros(capacity, dtype=np.float64)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+
+    def add(self, trade: Trade):
+        """Add or replace a position"""
+        trade_id = str(trade.id)
+        if trade_id in self.row_by_id:
+            self.remove(trade_id)
+
+        if self.size == len(self.entry_price):
+            self._grow()
+
+        row = self.size
+        self.entry_price[row] = trade.entry_price
+        self.volume[row] = trade.volume
+        self.side[row] = 1.0 if trade.user_type == TradeType.BUY else -1.0
+        self.contract_sizes[row] = self.contract_size
+        self.point_values[row] = self.point_value
+        self.last_pnl[row] = 0.0
+
+        self.trades.append(trade)
+        self.user_ids.append(str(trade.users_id))
+        self.stream_fields.append({
+            "id": trade_id,
+            "symbol": trade.symbol,
+            "user_type": trade.user_type.value,
+            "volume": trade.volume,
+            "entry_price": trade.entry_price,
+            "open_time": int(trade.open_time.timestamp() * 1000) if trade.open_time else None,
+            "status": trade.status.value
+        })
+        self.row_by_id[trade_id] = row
+        self.size += 1
+
+    def remove(self, trade_id: str) -> bool:
+        """Remove a position by trade id, returns False if it was not in the book"""
+        row = self.row_by_id.pop(trade_id, None)
+        if row is None:
+            return False
+
+        last = self.size - 1
+        if row != last:
+            for column in (self.entry_price, self.volume, self.side,
+                           self.contract_sizes, self.point_values, self.last_pnl):
+                column[row] = column[last]
+            moved = self.trades[last]
+            self.trades[row] = moved
+            self.user_ids[row] = self.user_ids[last]
+            self.stream_fields[row] = self.stream_fields[last]
+            self.row_by_id[str(moved.id)] = row
+
+        self.trades.pop()
+        self.user_ids.pop()
+        self.stream_fields.pop()
+        self.size = last
+        return True
+
+    def compute(self, bid: float, ask: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Compute current price, price diff, unrealized P&L and pips for every row
+        from the USER perspective (buys close at bid, sells close at ask).
+        Each row's P&L is kept in last_pnl until the next call.
+        """
+        n = self.size
+        side = self.side[:n]
+        is_buy = side > 0
+
+        current_price = np.where(is_buy, bid, ask)
+        price_diff = (current_price - self.entry_price[:n]) * side
+        unrealized_pnl = price_diff * self.volume[:n] * self.contract_sizes[:n] * self.point_values[:n]
+        pips = price_diff * self.pip_multiplier
+        self.last_pnl[:n] = unrealized_pnl
+
+        return current_price, price_diff, unrealized_pnl, pips
+
+    def last_pnl_of(self, trade_id: str) -> float:
+        """A position's P&L as of the last compute(), 0 if it has not been priced or is not in the book"""
+        row = self.row_by_id.get(trade_id)
+        return float(self.last_pnl[row]) if row is not None else 0.0
+
+    def stream_row(self, trade_id: str, bid: float, ask: float) -> Optional[Dict]:
+        """One position's positions_update row at this quote (for snapshots), None if it is not in the book"""
+        row = self.row_by_id.get(trade_id)
+        if row is None:
+            return None
+
+        side = self.side[row]
+        current_price = bid if side > 0 else ask
+        price_diff = (current_price - self.entry_price[row]) * side
+        unrealized_pnl = price_diff * self.volume[row] * self.contract_sizes[row] * self.point_values[row]
+
+        return {
+            **self.stream_fields[row],
+            "current_price": current_price,
+            "unrealized_pnl": round(float(unrealized_pnl), 2),
+            "price_diff": round(float(price_diff), 5),
+            "pips": round(float(price_diff * self.pip_multiplier), 1)
+        }
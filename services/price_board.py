@@ -0,0 +1,118 @@
+import logging
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0x50524943455F4231  # "PRICE_B1"
+HEADER_WORDS = 2            # magic, slot count
+FIELDS = 4                  # time_msc, bid, ask, volume
+READ_RETRIES = 10000        # a writer that died mid-update leaves its slot odd forever
+
+
+class PriceBoard:
+    """
+    Latest quote per symbol in shared memory, written by one feed process and
+    read lock-free by any number of workers.
+
+    Each symbol owns a slot guarded by a seqlock: the writer bumps the slot's
+    sequence to odd, writes the fields and bumps it back to even; a reader
+    copies the fields and retries if the sequence was odd or changed while it
+    read. Slots follow the order of settings.SYMBOLS, which every process
+    shares.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, symbols: List[str], owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.symbols = list(symbols)
+        self.slot_by_symbol: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        count = len(self.symbols)
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.uint64, buffer=shm.buf)
+        self.seqs = np.ndarray((count,), dtype=np.uint64, buffer=shm.buf, offset=HEADER_WORDS * 8)
+        self.data = np.ndarray((count, FIELDS), dtype=np.float64, buffer=shm.buf,
+                               offset=(HEADER_WORDS + count) * 8)
+
+    @staticmethod
+    def _size(count: int) -> int:
+        return (HEADER_WORDS + count + count * FIELDS) * 8
+
+    @classmethod
+    def create(cls, symbols: List[str] = settings.SYMBOLS, name: str = settings.PRICE_BOARD_NAME) -> "PriceBoard":
+        """Create the board (feed process); replaces a board left behind by a crashed feed"""
+        try:
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+        shm = shared_memory.SharedMemory(name=name, create=True, size=cls._size(len(symbols)))
+        board = cls(shm, symbols, owner=True)
+        board.seqs[:] = 0
+        board.header[1] = len(symbols)
+        board.header[0] = MAGIC
+        logger.info(f"✅ Price board {name} created for {len(symbols)} symbols")
+        return board
+
+    @classmethod
+    def attach(cls, symbols: List[str] = settings.SYMBOLS, name: str = settings.PRICE_BOARD_NAME) -> "PriceBoard":
+        """Attach to the feed's board (worker process); raises FileNotFoundError if there is none"""
+        shm = shared_memory.SharedMemory(name=name)
+        # Readers must not unlink the segment when they exit
+        resource_tracker.unregister(shm._name, "shared_memory")
+        board = cls(shm, symbols, owner=False)
+        if board.header[0] != MAGIC or board.header[1] != len(symbols):
+            shm.close()
+            raise ValueError(f"Price board {name} does not match the configured symbols")
+        return board
+
+    def publish(self, symbol: str, tick: Dict):
+        """Write one quote; single writer only"""
+        i = self.slot_by_symbol[symbol]
+        self.seqs[i] += 1  # odd: write in progress
+        self.data[i] = (
+            tick.get("time_msc") or tick.get("time", 0) * 1000,
+            tick["bid"],
+            tick["ask"],
+            tick.get("volume", 0.0)
+        )
+        self.seqs[i] += 1  # even: consistent
+
+    def read(self, symbol: str) -> Optional[Dict]:
+        """Latest quote as bid/ask/time/time_msc/volume, or None if nothing was published yet"""
+        i = self.slot_by_symbol.get(symbol)
+        if i is None:
+            return None
+        seqs = self.seqs
+        for _ in range(READ_RETRIES):
+            seq = int(seqs[i])
+            if seq & 1:
+                continue
+            time_msc, bid, ask, volume = self.data[i].tolist()
+            if int(seqs[i]) != seq:
+                continue
+            if seq == 0:
+                return None
+            time_msc = int(time_msc)
+            return {"bid": bid, "ask": ask, "time": time_msc // 1000, "time_msc": time_msc, "volume": volume}
+
+        logger.warning(f"Price board slot for {symbol} stayed locked, is the feed process alive?")
+        return None
+
+    def read_all(self, symbols: List[str]) -> Dict[str, Dict]:
+        ticks = {}
+        for symbol in symbols:
+            tick = self.read(symbol)
+            if tick:
+                ticks[symbol] = tick
+        return ticks
+
+    def close(self):
+        self.header = self.seqs = self.data = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
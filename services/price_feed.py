@@ -0,0 +1,83 @@
+"""
+Standalone price feed for multi-worker deployments.
+
+Owns the single market data connection and publishes every new quote to the
+shared-memory price board; uvicorn workers started with PRICE_BOARD_ENABLED
+read the board instead of opening their own terminal connection. The symbol
+specs read from the terminal are written to PRICE_BOARD_SPECS_FILE before
+the board is created, so workers compute margin and P&L with the same
+contract sizes as a single-process deployment. Tick recording, when enabled,
+happens here rather than in every worker.
+
+    python -m services.price_feed
+    PRICE_BOARD_ENABLED=true uvicorn main:app --workers 8
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict
+
+from config import settings
+from services.market_backend import get_market_backend
+from services.price_board import PriceBoard
+from services.symbol_registry import symbol_registry
+from services.tick_recorder import TickRecorder
+
+logger = logging.getLogger(__name__)
+
+
+async def run_price_feed():
+    backend = get_market_backend()
+    await backend.connect()
+    # Written before the board exists: a worker that can attach always finds the specs
+    await symbol_registry.load(backend)
+    symbol_registry.save_file(settings.PRICE_BOARD_SPECS_FILE)
+    board = PriceBoard.create()
+    recorder = TickRecorder() if settings.TICK_RECORDER_ENABLED else None
+    if recorder:
+        recorder.start()
+
+    last_tick_keys: Dict[str, tuple] = {}
+    poll_interval = settings.PRICE_POLL_MIN_INTERVAL
+    try:
+        while True:
+            started = time.perf_counter()
+            try:
+                ticks = await backend.get_symbol_prices(settings.SYMBOLS)
+            except Exception as e:
+                logger.error(f"Price feed error: {e}")
+                await asyncio.sleep(5)
+                continue
+
+            changed = 0
+            for symbol, tick in ticks.items():
+                tick_key = (tick.get("time_msc", tick.get("time")), tick["bid"], tick["ask"])
+                if last_tick_keys.get(symbol) == tick_key:
+                    continue
+                last_tick_keys[symbol] = tick_key
+                changed += 1
+                board.publish(symbol, tick)
+                if recorder:
+                    recorder.record(symbol, tick)
+
+            # Poll fast while the market moves, back off while it is quiet
+            if changed:
+                poll_interval = settings.PRICE_POLL_MIN_INTERVAL
+            else:
+                poll_interval = min(poll_interval * 2, settings.PRICE_POLL_MAX_INTERVAL)
+
+            await asyncio.sleep(max(0.0, poll_interval - (time.perf_counter() - started)))
+    finally:
+        if recorder:
+            recorder.stop()
+        board.close()
+        await backend.disconnect()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(run_price_feed())
+    except KeyboardInterrupt:
+        pass
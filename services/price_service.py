@@ -492,48 +492,130 @@
 #         }# services/price_service.py - FIXED VERSION
 
 import asyncio
-import json
-from typing import Dict, List, Optional
+import enum
+import time
+import uuid
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from datetime import datetime
 import logging
 from config import settings
 from services.mt5_service import MT5Service
-from schemas.trade import PriceUpdate
+from services.position_book import PositionBook
+from services.symbol_registry import symbol_registry
+from services.tick_recorder import TickRecorder
+from services.candle_service import CandleAggregator, TIMEFRAMES
+from services.candle_writer import CandleWriter
+from services.price_board import PriceBoard
+from services.leader_election import leader
+from services.event_bus import event_bus
+from services.margin_engine import MarginEngine
+from services.metrics import get_histogram
+from websocket.encoding import Frame, now_ms
+from websocket.registry import registry
+from websocket.topics import ACCOUNT, POSITIONS, candle_topic, default_topics, price_topic, routing_key
 
 logger = logging.getLogger(__name__)
 
+# Bumped whenever the layout of snapshot frames changes
+SNAPSHOT_VERSION = 1
+
+class PositionEvent(str, enum.Enum):
+    OPENED = "opened"
+    CLOSED = "closed"
+    MODIFIED = "modified"
+
+class OrderEvent(str, enum.Enum):
+    PLACED = "placed"
+    CANCELLED = "cancelled"
+    FILLED = "filled"
+
 class PriceService:
     def __init__(self):
         self.mt5_service = MT5Service()
         self.prices: Dict[str, Dict] = {}
         self.daily_stats: Dict[str, Dict] = {}
-        self.subscribers: List = []
+        # Shared with the connection manager: connections by socket, user and topic routing key
+        self.registry = registry
+        self.topic_seqs: Dict[str, int] = {}  # routing key -> sequence number of its last frame
+        self.candles = CandleAggregator()
+        self.candle_writer: Optional[CandleWriter] = CandleWriter() if settings.CANDLE_PERSIST_ENABLED else None
+        # Per-user equity and margin level, updated from every tick's P&L
+        self.margin_engine = MarginEngine()
+        self.margin_service = None  # executes stop-outs and margin calls (leader only)
+        self._stop_out_tasks: Set[asyncio.Task] = set()  # running liquidations, referenced until done
         self.last_reset_date = datetime.now().date()
+        self.last_tick_keys: Dict[str, tuple] = {}  # symbol -> (time_msc, bid, ask) of the last processed tick
+        self.poll_interval = settings.PRICE_POLL_MIN_INTERVAL
+        # With the shared price board the feed process records ticks, not every worker
+        self.tick_recorder: Optional[TickRecorder] = (
+            TickRecorder() if settings.TICK_RECORDER_ENABLED and not settings.PRICE_BOARD_ENABLED else None
+        )
+        self.price_board: Optional[PriceBoard] = None
         # Cache for open positions to avoid database calls during price updates
-        self.cached_positions: Dict[str, List] = {}  # symbol -> list of positions
+        self.cached_positions: Dict[str, Dict] = {}  # symbol -> {trade_id: trade}
+        self.position_books: Dict[str, PositionBook] = {}  # symbol -> columnar P&L book
+        self.user_positions: Dict[str, Dict] = {}  # user_id -> {trade_id: trade}, for snapshots
         self.last_position_cache_update = datetime.now()
-        self.cache_update_interval = 30  # seconds
+        # Open/close/modify events keep the cache current; the DB reload is only a reconciliation pass
+        self.cache_update_interval = settings.POSITION_RECONCILE_INTERVAL  # seconds
+        self.last_reconcile_drift: Dict[str, int] = {"missing": 0, "stale": 0, "modified": 0}
+        self._position_cache_loaded = False
+        self._reconciling = False
+        self._touched_during_reconcile: Set[str] = set()
+        self._users_touched_during_reconcile: Set[str] = set()
         
         # Reference to trade service for order monitoring
         self.trade_service = None
+        
+        # Keep this worker's position cache and balances in step with the others
+        event_bus.subscribe("position", self._on_position_event)
+        event_bus.subscribe("balance", self._on_balance_event)
+        event_bus.subscribe("order", self._on_order_event)
     
     def set_trade_service(self, trade_service):
         """Set reference to trade service for order monitoring"""
         self.trade_service = trade_service
     
+    def set_margin_service(self, margin_service):
+        """Set reference to the margin call service that liquidates stop-outs"""
+        self.margin_service = margin_service
+    
     async def start_price_feed(self):
         """Start background task to fetch prices"""
-        await self.mt5_service.connect()
+        if settings.PRICE_BOARD_ENABLED:
+            # Quotes come from the feed process; the terminal is only connected for orders
+            self.price_board = PriceBoard.attach()
+            # The feed wrote the terminal's specs before creating the board
+            symbol_registry.load_file(settings.PRICE_BOARD_SPECS_FILE)
+            await symbol_registry.load()
+        else:
+            await self.mt5_service.connect()
+            await symbol_registry.load(self.mt5_service)
         self._reset_daily_stats()
         
+        if self.tick_recorder:
+            self.tick_recorder.start()
+        if self.candle_writer:
+            self.candle_writer.start()
+        
         # Start price update loop
         asyncio.create_task(self._price_update_loop())
         
         # Start position cache update loop
         asyncio.create_task(self._position_cache_update_loop())
         
-        # Start order monitoring loop (for limit orders and SL/TP on our backend)
-        asyncio.create_task(self._order_monitoring_loop())
+        # Limit orders and SL/TP are evaluated by the price loop on every tick
+
+    async def stop_price_feed(self):
+        """Flush recorders and writers and release the feed's connections"""
+        if self.tick_recorder:
+            self.tick_recorder.stop()
+        if self.candle_writer:
+            await self.candle_writer.stop()
+        if self.price_board:
+            self.price_board.close()
+            self.price_board = None
+        await self.mt5_service.disconnect()
 
     async def _price_update_loop(self):
         """Background loop to update prices and calculate position P&L"""
@@ -544,77 +626,132 @@ class PriceService:
                     self._reset_daily_stats()
                     self.last_reset_date = current_date
                 
-                for symbol in ["EURUSD", "USDJPY", "XAUUSD"]:  # Only monitor these 3 symbols
-                    price_data = await self.mt5_service.get_symbol_price(symbol)
-                    if price_data:
-                        # Calculate change from daily open
-                        previous_price = self.prices.get(symbol, {})
-                        daily_open = self.daily_stats.get(symbol, {}).get('open', price_data["bid"])
-                        
-                        change = price_data["bid"] - daily_open
-                        change_percent = (change / daily_open * 100) if daily_open != 0 else 0
-                        
-                        # Update daily stats
-                        self._update_daily_stats(symbol, price_data["bid"], price_data["ask"])
-                        
-                        # Enhanced price data
-                        enhanced_price_data = {
-                            "symbol": symbol,
-                            "bid": price_data["bid"],
-                            "ask": price_data["ask"],
-                            "timestamp": datetime.now().isoformat(),
-                            "high": self.daily_stats[symbol]["high"],
-                            "low": self.daily_stats[symbol]["low"],
-                            "change": change,
-                            "change_percent": change_percent,
-                            "spread": price_data["ask"] - price_data["bid"],
-                            "volume": price_data.get("volume", 0)
-                        }
-                        
-                        # Store locally
-                        self.prices[symbol] = enhanced_price_data
-                        
-                        # Notify WebSocket subscribers of price update
-                        await self._notify_price_update(enhanced_price_data)
-
-                        # Calculate and broadcast position updates with correct user P&L
-                        await self._calculate_and_broadcast_position_pnl(symbol, price_data["bid"], price_data["ask"])
-                        
-                await asyncio.sleep(1)  # Update every second
+                started = time.perf_counter()
                 
-            except Exception as e:
-                logger.error(f"Price update loop error: {e}")
-                await asyncio.sleep(5)
-
-    async def _order_monitoring_loop(self):
-        """✅ FIXED: Monitor pending orders and positions for execution/SL/TP triggers"""
-        while True:
-            try:
-                if self.trade_service:
-                    from database import get_database
-                    
-                    # ✅ FIXED: Use async generator correctly
-                    async for db in get_database():
-                        try:
-                            # Monitor pending limit orders
-                            await self.trade_service.monitor_pending_orders(db)
-                            
-                            # Monitor stop loss and take profit
-                            await self.trade_service.monitor_stop_loss_take_profit(db)
-                            
-                            break  # Exit the async for loop after successful execution
-                        except Exception as e:
-                            logger.error(f"Database operation error in monitoring: {e}")
-                            break
+                # All configured symbols in one batched backend call, or one pass over the board
+                if self.price_board:
+                    ticks = self.price_board.read_all(settings.SYMBOLS)
+                else:
+                    ticks = await self.mt5_service.get_symbol_prices(settings.SYMBOLS)
+                changed = await self.ingest_ticks(ticks)
                 
-                await asyncio.sleep(1)  # Check every second for precise execution
+                # Poll fast while the market moves, back off while it is quiet
+                if changed:
+                    self.poll_interval = settings.PRICE_POLL_MIN_INTERVAL
+                else:
+                    self.poll_interval = min(self.poll_interval * 2, settings.PRICE_POLL_MAX_INTERVAL)
+                
+                await asyncio.sleep(max(0.0, self.poll_interval - (time.perf_counter() - started)))
                 
             except Exception as e:
-                logger.error(f"Order monitoring loop error: {e}")
+                logger.error(f"Price update loop error: {e}")
                 await asyncio.sleep(5)
 
+    async def ingest_ticks(self, ticks: Dict[str, Dict], record: bool = True) -> int:
+        """
+        Run one round of ticks (at most one per symbol) through the pipeline.
+        Shared by the live price loop and tick replay; returns how many ticks were new.
+        """
+        # Every user's position updates for this round, sent as one frame per user
+        position_batch: Dict[str, List[Dict]] = {}
+        
+        changed = 0
+        for symbol, price_data in ticks.items():
+            # Skip ticks we already processed so unchanged quotes are not re-broadcast
+            tick_key = (price_data.get("time_msc", price_data.get("time")), price_data["bid"], price_data["ask"])
+            if self.last_tick_keys.get(symbol) == tick_key:
+                continue
+            self.last_tick_keys[symbol] = tick_key
+            changed += 1
+            
+            if record and self.tick_recorder:
+                self.tick_recorder.record(symbol, price_data)
+            
+            await self._process_tick(symbol, price_data, position_batch)
+        
+        self._broadcast_position_batch(position_batch)
+        return changed
+
+    async def _process_tick(self, symbol: str, price_data: Dict, position_batch: Dict[str, List[Dict]]):
+        """Run one tick through the pipeline: stats, triggers, price broadcast, position P&L"""
+        tick_received_at = time.perf_counter()
+        
+        # Calculate change from daily open
+        daily_open = self.daily_stats.get(symbol, {}).get('open', price_data["bid"])
+        
+        change = price_data["bid"] - daily_open
+        change_percent = (change / daily_open * 100) if daily_open != 0 else 0
+        
+        # Update daily stats
+        self._update_daily_stats(symbol, price_data["bid"], price_data["ask"])
+        
+        # Enhanced price data
+        enhanced_price_data = {
+            "symbol": symbol,
+            "bid": price_data["bid"],
+            "ask": price_data["ask"],
+            "timestamp": now_ms(),
+            "high": self.daily_stats[symbol]["high"],
+            "low": self.daily_stats[symbol]["low"],
+            "change": change,
+            "change_percent": change_percent,
+            "spread": price_data["ask"] - price_data["bid"],
+            "volume": price_data.get("volume", 0)
+        }
+        
+        # Store locally
+        self.prices[symbol] = enhanced_price_data
+        
+        # Bid candles, keyed by the terminal's tick time
+        tick_msc = price_data.get("time_msc") or int(price_data.get("time", time.time()) * 1000)
+        closed_candles = self.candles.update(symbol, tick_msc, price_data["bid"], price_data.get("volume", 0))
+        if closed_candles and self.candle_writer and leader.is_leader:
+            for timeframe, candle in closed_candles:
+                self.candle_writer.enqueue(symbol, timeframe, candle)
+        
+        # Take crossed limit orders and SL/TP out of the indexes; they execute in a background task
+        self._evaluate_triggers([symbol], {symbol: tick_received_at})
+        
+        # Notify WebSocket subscribers of price update
+        self._notify_price_update(enhanced_price_data)
+        self._notify_candle_update(symbol, closed_candles)
+
+        # Calculate position updates with correct user P&L
+        symbol_pnl = self._calculate_position_pnl(symbol, price_data["bid"], price_data["ask"], position_batch)
+        
+        # Margin levels move with the same tick; stop-outs fire from here, not from a poll
+        stop_outs, margin_calls = self.margin_engine.update_symbol_pnl(symbol, symbol_pnl)
+        if stop_outs or margin_calls:
+            self._handle_margin_events(stop_outs, margin_calls)
+
+    def _evaluate_triggers(self, symbols: List[str], tick_times: Dict[str, float]):
+        """✅ Dispatch pending orders and SL/TP crossed by the latest tick for execution (leader only)"""
+        if not self.trade_service or not leader.is_leader:
+            return
+        
+        try:
+            self.trade_service.process_tick(symbols, tick_times)
+        except Exception as e:
+            logger.error(f"Order trigger evaluation error: {e}")
+
+    def _handle_margin_events(self, stop_outs: List[Tuple[str, float]], margin_calls: List[Tuple[str, float]]):
+        """Hand margin breaches to the margin call service without blocking the tick (leader only)"""
+        if not self.margin_service or not leader.is_leader:
+            # Another worker liquidates; let this one report the breach again if it takes over
+            for user_id, _ in stop_outs:
+                self.margin_engine.stop_out_finished(user_id)
+            return
+        
+        for user_id, margin_level in stop_outs:
+            task = asyncio.create_task(self.margin_service.execute_stop_out(user_id, margin_level))
+            self._stop_out_tasks.add(task)
+            task.add_done_callback(self._stop_out_tasks.discard)
+            task.add_done_callback(lambda _, user_id=user_id: self.margin_engine.stop_out_finished(user_id))
+        for user_id, margin_level in margin_calls:
+            self.margin_service.send_margin_call(user_id, margin_level)
+
     async def _position_cache_update_loop(self):
-        """Periodically update position cache from database"""
+        """Periodically reconcile the event-driven position cache with the database"""
         while True:
             try:
                 await self._update_position_cache()
@@ -624,33 +761,78 @@ class PriceService:
                 await asyncio.sleep(self.cache_update_interval)
 
     async def _update_position_cache(self):
-        """✅ FIXED: Update cached positions from database"""
+        """Reconcile cached positions with the database and report any drift"""
         try:
             from database import get_database
             from sqlalchemy import select
             from models.trade import Trade, TradeStatus
             
-            # ✅ FIXED: Use async generator correctly
+            self._reconciling = True
+            self._touched_during_reconcile = set()
+            self._users_touched_during_reconcile = set()
+            
             async for db in get_database():
                 try:
                     # Fetch all open positions
                     result = await db.execute(
                         select(Trade).where(Trade.status == TradeStatus.EXECUTED)
                     )
-                    open_trades = result.scalars().all()
+                    open_trades = {str(trade.id): trade for trade in result.scalars().all()}
+                    
+                    # Events applied while the query ran are newer than the snapshot
+                    touched = self._touched_during_reconcile
+                    cached = {
+                        trade_id: trade
+                        for positions in self.cached_positions.values()
+                        for trade_id, trade in positions.items()
+                    }
+                    
+                    drift = {"missing": 0, "stale": 0, "modified": 0}
+                    for trade_id, trade in open_trades.items():
+                        if trade_id in touched:
+                            continue
+                        cached_trade = cached.get(trade_id)
+                        if cached_trade is None:
+                            drift["missing"] += 1
+                            self._cache_add(trade)
+                            self._publish_position_delta(PositionEvent.OPENED, trade)
+                        elif (cached_trade.entry_price != trade.entry_price
+                              or cached_trade.volume != trade.volume
+                              or cached_trade.stop_loss != trade.stop_loss
+                              or cached_trade.take_profit != trade.take_profit):
+                            drift["modified"] += 1
+                            self._cache_add(trade)
+                            self._publish_position_delta(PositionEvent.MODIFIED, trade)
+                    
+                    for trade_id, trade in cached.items():
+                        if trade_id not in open_trades and trade_id not in touched:
+                            drift["stale"] += 1
+                            self._cache_remove(trade)
+                            self._publish_position_delta(PositionEvent.CLOSED, trade)
                     
-                    # Group by symbol
-                    new_cache = {}
-                    for trade in open_trades:
-                        if trade.symbol not in new_cache:
-                            new_cache[trade.symbol] = []
-                        new_cache[trade.symbol].append(trade)
+                    # Seed and verify the margin engine's balances and used margin
+                    accounts = await self._load_margin_accounts(db)
+                    margin_drift = self.margin_engine.reconcile(accounts, self._users_touched_during_reconcile)
+                    if margin_drift and self._position_cache_loaded:
+                        logger.warning(f"Margin state drift repaired for {margin_drift} users")
+                    self.margin_engine.resync_unrealized()
                     
-                    self.cached_positions = new_cache
                     self.last_position_cache_update = datetime.now()
                     
-                    total_positions = sum(len(positions) for positions in new_cache.values())
-                    logger.debug(f"Position cache updated: {total_positions} positions across {len(new_cache)} symbols")
+                    if not self._position_cache_loaded:
+                        # Initial load populates the cache, it is not drift
+                        self._position_cache_loaded = True
+                        logger.info(f"Position cache loaded: {len(open_trades)} open positions")
+                    else:
+                        self.last_reconcile_drift = drift
+                        if any(drift.values()):
+                            logger.warning(
+                                f"Position cache drift repaired: {drift['missing']} missing, "
+                                f"{drift['stale']} stale, {drift['modified']} modified"
+                            )
+                    
+                    total_positions = sum(len(positions) for positions in self.cached_positions.values())
+                    logger.debug(f"Position cache reconciled: {total_positions} positions across {len(self.cached_positions)} symbols")
                     
                     break  # Exit the async for loop after successful execution
                 except Exception as e:
@@ -659,95 +841,283 @@ class PriceService:
                 
         except Exception as e:
             logger.error(f"Failed to update position cache: {e}")
+        finally:
+            self._reconciling = False
+
+    async def _load_margin_accounts(self, db) -> Dict[str, Tuple[float, float, int]]:
+        """Balance, used margin and open position count of every active user with open positions, in one grouped query"""
+        from sqlalchemy import and_, select, func
+        from models.trade import Trade, TradeStatus
+        from models.user import User
+        
+        started = time.perf_counter()
+        result = await db.execute(
+            select(User.id, User.balance, func.coalesce(func.sum(Trade.margin_required), 0.0), func.count(Trade.id))
+            .join(Trade, Trade.users_id == User.id)
+            .where(and_(Trade.status == TradeStatus.EXECUTED, User.is_active == True, User.is_deleted == False))
+            .group_by(User.id, User.balance)
+        )
+        accounts = {
+            str(user_id): (balance, float(margin_used), count)
+            for user_id, balance, margin_used, count in result.all()
+        }
+        get_histogram("margin.accounts_query").observe((time.perf_counter() - started) * 1000)
+        return accounts
+
+    def publish_position_event(self, event: PositionEvent, trade):
+        """Apply an open/close/modify event to the position cache and share it with other workers"""
+        self._apply_position_event(event, trade)
+        event_bus.publish("position", {"event": event.value, "trade": self._position_payload(trade)}, remote_only=True)
 
-    async def _calculate_and_broadcast_position_pnl(self, symbol: str, bid: float, ask: float):
-        """Calculate P&L for all positions of a symbol and broadcast updates (from USER perspective)"""
+    def _on_position_event(self, data: Dict):
+        """Position event from another worker"""
+        self._apply_position_event(PositionEvent(data["event"]), self._position_from_payload(data["trade"]))
+
+    @staticmethod
+    def _position_payload(trade) -> Dict:
+        return {
+            "id": str(trade.id),
+            "ticket": trade.ticket,
+            "users_id": str(trade.users_id),
+            "symbol": trade.symbol,
+            "user_type": trade.user_type.value,
+            "volume": trade.volume,
+            "entry_price": trade.entry_price,
+            "margin_required": trade.margin_required,
+            "stop_loss": trade.stop_loss,
+            "take_profit": trade.take_profit,
+            "open_time": trade.open_time.isoformat() if trade.open_time else None,
+            "status": trade.status.value
+        }
+
+    @staticmethod
+    def _position_from_payload(data: Dict):
+        """Detached Trade carrying just the fields the cache and P&L stream use"""
+        from models.trade import Trade, TradeStatus, TradeType
+        return Trade(
+            id=uuid.UUID(data["id"]),
+            ticket=data["ticket"],
+            users_id=uuid.UUID(data["users_id"]),
+            symbol=data["symbol"],
+            user_type=TradeType(data["user_type"]),
+            volume=data["volume"],
+            entry_price=data["entry_price"],
+            margin_required=data["margin_required"],
+            stop_loss=data["stop_loss"],
+            take_profit=data["take_profit"],
+            open_time=datetime.fromisoformat(data["open_time"]) if data["open_time"] else None,
+            status=TradeStatus(data["status"])
+        )
+
+    def _apply_position_event(self, event: PositionEvent, trade):
+        """Apply an open/close/modify event to the position cache in O(1)"""
         try:
-            # Get positions from cache
-            positions = self.cached_positions.get(symbol, [])
+            if self._reconciling:
+                self._touched_during_reconcile.add(str(trade.id))
+                self._users_touched_during_reconcile.add(str(trade.users_id))
+            
+            if event == PositionEvent.CLOSED:
+                self._cache_remove(trade)
+            else:
+                self._cache_add(trade)
+            self._publish_position_delta(event, trade)
             
+            logger.debug(f"Position {event.value}: {trade.ticket} {trade.symbol}")
+        except Exception as e:
+            logger.error(f"Failed to apply position event {event} for {trade.ticket}: {e}")
+
+    def _publish_position_delta(self, event: PositionEvent, trade):
+        """position_opened/_modified/_closed on the owner's positions topic, in seq order with the P&L frames"""
+        key = routing_key(POSITIONS, str(trade.users_id))
+        connections = self.registry.topic_connections(key)
+        if not connections:
+            return
+        
+        if event == PositionEvent.CLOSED:
+            data = {"id": str(trade.id), "ticket": trade.ticket, "symbol": trade.symbol}
+        else:
+            data = {"position": self._position_row(trade)}
+        data["timestamp"] = now_ms()
+        self._publish(key, POSITIONS, connections, {"type": f"position_{event.value}", "data": data})
+
+    def publish_order_event(self, event: OrderEvent, user_id: str, order: Dict):
+        """Announce a limit order placed, cancelled or filled to the owner's positions subscribers in every worker"""
+        event_bus.publish("order", {"event": event.value, "user_id": user_id, "order": order})
+
+    def _on_order_event(self, data: Dict):
+        key = routing_key(POSITIONS, data["user_id"])
+        connections = self.registry.topic_connections(key)
+        if not connections:
+            return
+        self._publish(key, POSITIONS, connections, {
+            "type": f"order_{data['event']}",
+            "data": {"order": data["order"], "timestamp": now_ms()}
+        })
+
+    def _cache_add(self, trade):
+        """Insert or replace a position in the cache and its symbol book"""
+        trade_id = str(trade.id)
+        positions = self.cached_positions.setdefault(trade.symbol, {})
+        previous = positions.get(trade_id)
+        positions[trade_id] = trade
+        self.user_positions.setdefault(str(trade.users_id), {})[trade_id] = trade
+        if previous is not None:
+            self.margin_engine.replace_position(previous, trade)
+        else:
+            self.margin_engine.add_position(trade)
+        
+        book = self.position_books.get(trade.symbol)
+        if book is None:
+            book = self._new_position_book(trade.symbol)
+            self.position_books[trade.symbol] = book
+        book.add(trade)
+
+    def _cache_remove(self, trade):
+        """Drop a position from the cache and its symbol book"""
+        trade_id = str(trade.id)
+        book = self.position_books.get(trade.symbol)
+        positions = self.cached_positions.get(trade.symbol)
+        if positions is not None:
+            previous = positions.pop(trade_id, None)
+            if previous is not None:
+                last_pnl = book.last_pnl_of(trade_id) if book is not None else 0.0
+                self.margin_engine.remove_position(previous, last_pnl)
+                user_positions = self.user_positions.get(str(previous.users_id))
+                if user_positions is not None:
+                    user_positions.pop(trade_id, None)
+                    if not user_positions:
+                        del self.user_positions[str(previous.users_id)]
             if not positions:
-                return
+                del self.cached_positions[trade.symbol]
+        
+        if book is not None:
+            book.remove(trade_id)
+            if not len(book):
+                del self.position_books[trade.symbol]
+
+    def _new_position_book(self, symbol: str, capacity: int = 64) -> PositionBook:
+        """Create an empty columnar position book for a symbol"""
+        spec = symbol_registry.get(symbol)
+        return PositionBook(
+            symbol,
+            contract_size=spec.contract_size,
+            point_value=spec.point_value,
+            pip_multiplier=spec.pip_multiplier,
+            capacity=capacity
+        )
+
+    def _calculate_position_pnl(self, symbol: str, bid: float, ask: float, batch: Dict[str, List[Dict]]) -> Dict[str, float]:
+        """
+        Calculate P&L for all positions of a symbol and add them to the per-user batch (from USER perspective).
+        Returns each user's total P&L in the symbol.
+        """
+        symbol_pnl: Dict[str, float] = {}
+        try:
+            book = self.position_books.get(symbol)
             
-            logger.debug(f"💰 Calculating P&L for {len(positions)} {symbol} positions")
+            if not book:
+                return symbol_pnl
             
-            for trade in positions:
-                try:
-                    # Determine current price based on USER'S trade type (not execution type)
-                    current_price = bid if trade.user_type.value == 'buy' else ask
-                    
-                    # Calculate unrealized P&L from USER'S perspective
-                    if trade.user_type.value == 'buy':
-                        # User bought, profits when price goes up
-                        price_diff = current_price - trade.entry_price
-                    else:
-                        # User sold, profits when price goes down  
-                        price_diff = trade.entry_price - current_price
-                    
-                    # Calculate P&L based on symbol specifications
-                    point_value = self._get_point_value(symbol)
-                    contract_size = await self.get_contract_size(symbol)
-
-                    unrealized_pnl = price_diff * trade.volume * contract_size * point_value
-                    
-                    # Calculate pips from user's perspective
-                    pips = self._calculate_pips(symbol, trade.entry_price, current_price, trade.user_type.value)
-                    
-                    # Create position update message
-                    position_update = {
-                        "type": "position_update",
-                        "data": {
-                            "id": str(trade.id),
-                            "symbol": trade.symbol,
-                            "user_type": trade.user_type.value,
-                            "volume": trade.volume,
-                            "entry_price": trade.entry_price,
-                            "current_price": current_price,
-                            "unrealized_pnl": round(unrealized_pnl, 2),
-                            "price_diff": round(price_diff, 5),
-                            "pips": round(pips, 1),
-                            "open_time": trade.open_time.isoformat(),
-                            "status": trade.status.value,
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    }
-                    
-                    # Broadcast to WebSocket subscribers
-                    await self._notify_position_update(position_update)
-                    
-                except Exception as e:
-                    logger.error(f"Error calculating P&L for trade {trade.id}: {e}")
+            logger.debug(f"💰 Calculating P&L for {len(book)} {symbol} positions")
+            
+            # One vectorized pass over every open position of the symbol
+            current_price, price_diff, unrealized_pnl, pips = book.compute(bid, ask)
+            current_price = current_price.tolist()
+            price_diff = price_diff.round(5).tolist()
+            # Unrounded for the margin engine: a closing position subtracts exactly its book P&L
+            row_pnl = unrealized_pnl.tolist()
+            unrealized_pnl = unrealized_pnl.round(2).tolist()
+            pips = pips.round(1).tolist()
+            
+            # Rows are only built for users with a connection watching their positions
+            user_rows: Dict[str, Optional[List[Dict]]] = {}
+            stream_fields = book.stream_fields
+            for row, user_id in enumerate(book.user_ids):
+                symbol_pnl[user_id] = symbol_pnl.get(user_id, 0.0) + row_pnl[row]
+                if user_id in user_rows:
+                    rows = user_rows[user_id]
+                else:
+                    rows = user_rows[user_id] = self._batch_rows(user_id, batch)
+                if rows is None:
+                    continue
+                # Static fields (id, side, volume, open time, ...) are built once per position, not per tick
+                rows.append({
+                    **stream_fields[row],
+                    "current_price": current_price[row],
+                    "unrealized_pnl": unrealized_pnl[row],
+                    "price_diff": price_diff[row],
+                    "pips": pips[row]
+                })
                     
         except Exception as e:
             logger.error(f"Position P&L calculation error for {symbol}: {e}")
+        
+        return symbol_pnl
 
-    def _get_point_value(self, symbol: str) -> float:
-        """Get point value for P&L calculations"""
-        if "JPY" in symbol:
-            return 0.01  # 1 pip = 0.01 for JPY pairs
-        elif symbol == "XAUUSD":
-            return 0.1   # 1 pip = $0.10 for Gold per 0.01 move
-        else:
-            return 1     # 1 pip = $1 for major pairs per 0.0001 move
+    def _batch_rows(self, user_id: str, batch: Dict[str, List[Dict]]) -> Optional[List[Dict]]:
+        """The user's rows in this round's batch, None unless a connection watches their positions"""
+        by_topic = self.registry.by_topic
+        if f"{POSITIONS}:{user_id}" in by_topic:
+            return batch.setdefault(user_id, [])
+        if f"{ACCOUNT}:{user_id}" in by_topic:
+            batch.setdefault(user_id, [])  # account figures only
+        return None
 
-    def _calculate_pips(self, symbol: str, entry_price: float, current_price: float, trade_type: str) -> float:
-        """Calculate pips gained/lost from user's perspective"""
-        if trade_type == 'buy':
-            price_diff = current_price - entry_price
-        else:
-            price_diff = entry_price - current_price
+    def _broadcast_position_batch(self, batch: Dict[str, List[Dict]]):
+        """Send each user one frame with all of their position updates for this tick, and their account figures"""
+        if not batch:
+            return
         
-        if "JPY" in symbol:
-            return price_diff * 100
-        elif symbol == "XAUUSD":
-            return price_diff * 10
-        else:
-            return price_diff * 10000
+        timestamp = now_ms()
+        by_topic = self.registry.by_topic
+        
+        for user_id, positions in batch.items():
+            try:
+                position_connections = by_topic.get(f"{POSITIONS}:{user_id}")
+                account_connections = by_topic.get(f"{ACCOUNT}:{user_id}")
+                account = self._get_account_snapshot(user_id) if account_connections or settings.POSITION_STREAM_INCLUDE_ACCOUNT else None
+                
+                if position_connections:
+                    data = {
+                        "positions": positions,
+                        "timestamp": timestamp
+                    }
+                    if settings.POSITION_STREAM_INCLUDE_ACCOUNT and account:
+                        data["account"] = account
+                    
+                    self._publish(f"{POSITIONS}:{user_id}", POSITIONS, position_connections, {
+                        "type": "positions_update",
+                        "data": data
+                    })
+                
+                if account_connections and account:
+                    self._publish(f"{ACCOUNT}:{user_id}", ACCOUNT, account_connections, {
+                        "type": "account_update",
+                        "data": dict(account, timestamp=timestamp)
+                    }, conflate=True)
+            except Exception as e:
+                logger.error(f"Error broadcasting positions for user {user_id}: {e}")
+
+    def _get_account_snapshot(self, user_id: str) -> Optional[Dict]:
+        """Equity and margin level from the cached balance and the latest tick P&L"""
+        return self.margin_engine.snapshot(user_id)
+
+    def update_account_balance(self, user_id: str, balance: float):
+        """Record a user's latest balance for margin checks and the position stream, in every worker"""
+        if self._reconciling:
+            self._users_touched_during_reconcile.add(user_id)
+        self.margin_engine.set_balance(user_id, balance)
+        event_bus.publish("balance", {"user_id": user_id, "balance": balance}, remote_only=True)
+
+    def _on_balance_event(self, data: Dict):
+        if self._reconciling:
+            self._users_touched_during_reconcile.add(data["user_id"])
+        self.margin_engine.set_balance(data["user_id"], data["balance"])
 
     def _reset_daily_stats(self):
         """Reset daily statistics"""
         logger.info("Resetting daily price statistics")
-        for symbol in ["EURUSD", "USDJPY", "XAUUSD"]:  # Only these 3 symbols
+        for symbol in settings.SYMBOLS:
             if symbol in self.prices:
                 current_price = self.prices[symbol]
                 self.daily_stats[symbol] = {
@@ -779,9 +1149,11 @@ class PriceService:
             stats["low"] = min(stats["low"], bid)
             stats["volume"] += 1
 
-    async def _notify_price_update(self, price_data: Dict):
-        """Notify subscribers of price updates"""
-        if not self.subscribers:
+    def _notify_price_update(self, price_data: Dict):
+        """Notify the symbol's subscribers of a price update"""
+        topic = price_topic(price_data["symbol"])
+        connections = self.registry.topic_connections(topic)
+        if not connections:
             return
         
         message = {
@@ -789,35 +1161,72 @@ class PriceService:
             "data": price_data
         }
         
-        await self._broadcast_message(message)
+        # A client that has not taken the previous quote yet only gets the latest one
+        self._publish(topic, topic, connections, message, conflate=True)
 
-    async def _notify_position_update(self, position_update: Dict):
-        """Notify subscribers of position P&L updates"""
-        if not self.subscribers:
-            return
-        
-        await self._broadcast_message(position_update)
+    def _notify_candle_update(self, symbol: str, closed_candles: List[Tuple[str, Dict]]):
+        """Send closed bars and the forming bar to each candles:<symbol>:<timeframe> subscriber"""
+        for timeframe in TIMEFRAMES:
+            topic = candle_topic(symbol, timeframe)
+            connections = self.registry.topic_connections(topic)
+            if not connections:
+                continue
+            
+            for closed_timeframe, candle in closed_candles:
+                if closed_timeframe == timeframe:
+                    self._publish(topic, topic, connections, {
+                        "type": "candle_update",
+                        "symbol": symbol,
+                        "timeframe": timeframe,
+                        "closed": True,
+                        "data": candle
+                    }, conflate=True, final=True)
+            
+            self._publish(topic, topic, connections, {
+                "type": "candle_update",
+                "symbol": symbol,
+                "timeframe": timeframe,
+                "closed": False,
+                "data": self.candles.current(symbol, timeframe)
+            }, conflate=True)
 
-    async def _broadcast_message(self, message: Dict):
-        """Broadcast message to all connected WebSocket clients"""
-        if not self.subscribers:
-            return
-        
-        active_subscribers = []
-        message_str = json.dumps(message, default=str)
-        
-        for websocket in self.subscribers:
-            try:
-                await websocket.send_text(message_str)
-                active_subscribers.append(websocket)
-            except Exception as e:
-                logger.debug(f"WebSocket send failed: {e}")
-                pass  # WebSocket disconnected
+    def _publish(self, key: str, topic: str, connections: Iterable, message: Dict, conflate: bool = False, final: bool = False):
+        """
+        Stamp a frame with its topic and the next sequence number of its routing key and queue it.
+        Clients compare seq with their snapshot's to spot gaps in delta topics (positions) and
+        ask for a resync; conflated topics (prices, candles, account) carry full state, so a
+        skipped seq there loses nothing.
+        """
+        seq = self.topic_seqs.get(key, 0) + 1
+        self.topic_seqs[key] = seq
+        message["topic"] = topic
+        message["seq"] = seq
+        self._send_to_sockets(connections, message, conflate_key=key if conflate else None, final=final)
+
+    def _send_to_sockets(self, connections: Iterable, message: Dict, conflate_key: Optional[str] = None, final: bool = False):
+        """Encode a message once per wire format and queue it on a group of connections; never awaits a socket"""
+        frame = Frame(message)
         
-        self.subscribers = active_subscribers
+        # No copy: a connection closed by send() leaves the registry's sets only after this loop
+        for connection in connections:
+            connection.send(frame.encode(connection.format), conflate_key, final)
 
     async def get_price(self, symbol: str) -> Optional[Dict]:
         """Get current price for symbol"""
+        if self.price_board:
+            # The board is never older than the last tick this worker processed
+            tick = self.price_board.read(symbol)
+            if not tick:
+                return self.prices.get(symbol)
+            price = dict(self.prices.get(symbol) or {"symbol": symbol})
+            price.update(
+                bid=tick["bid"],
+                ask=tick["ask"],
+                spread=tick["ask"] - tick["bid"],
+                timestamp=now_ms()
+            )
+            return price
+        
         if symbol in self.prices:
             return self.prices[symbol]
         
@@ -828,25 +1237,122 @@ class PriceService:
                 "symbol": symbol,
                 "bid": price_data["bid"],
                 "ask": price_data["ask"],
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_ms(),
                 "spread": price_data["ask"] - price_data["bid"]
             }
         
         return None
 
-    def add_subscriber(self, websocket):
-        """Add WebSocket subscriber"""
-        self.subscribers.append(websocket)
-        logger.info(f"WebSocket subscriber added. Total: {len(self.subscribers)}")
+    def add_subscriber(self, websocket, user_id: Optional[str] = None, pending_orders: Optional[List[Dict]] = None):
+        """
+        Register a connection (anything with a non-blocking send() and a topics set) if the
+        connection manager has not, and apply its default topics: until the client subscribes
+        explicitly it gets every price and, when authenticated, its own positions; each starts
+        with a snapshot. user_id must match the connection's.
+        """
+        if self.registry.add(websocket):
+            logger.debug(f"WebSocket subscriber added. Total: {len(self.registry)}")
+        self._add_topics(websocket, default_topics(user_id), pending_orders)
 
     def remove_subscriber(self, websocket):
-        """Remove WebSocket subscriber"""
-        if websocket in self.subscribers:
-            self.subscribers.remove(websocket)
-            logger.info(f"WebSocket subscriber removed. Total: {len(self.subscribers)}")
+        """Forget a connection and all of its topics"""
+        if self.registry.remove(websocket):
+            logger.debug(f"WebSocket subscriber removed. Total: {len(self.registry)}")
+
+    def subscribe(self, websocket, topics: List[str], pending_orders: Optional[List[Dict]] = None):
+        """
+        Route these topics (see websocket/topics.py) to a connection, each starting with a snapshot;
+        the first call replaces the defaults. pending_orders goes into the positions snapshot.
+        """
+        if not websocket.explicit_topics:
+            websocket.explicit_topics = True
+            self.unsubscribe(websocket)
+        self._add_topics(websocket, topics, pending_orders)
+
+    def subscribe_legacy(self, websocket, topics: List[str]):
+        """
+        The pre-topic {"symbols": [...]} and subscribe_candles forms, which never dropped positions:
+        requested price topics replace the connection's current ones, anything else is added
+        """
+        if any(topic.startswith("prices:") for topic in topics):
+            self.unsubscribe(websocket, [topic for topic in websocket.topics if topic.startswith("prices:") and topic not in topics])
+        self._add_topics(websocket, topics)
+
+    def unsubscribe(self, websocket, topics: Optional[List[str]] = None):
+        """Stop routing topics to a connection; all of them when topics is None"""
+        for topic in list(websocket.topics if topics is None else topics):
+            self.registry.remove_topic(websocket, topic)
+
+    def resync(self, websocket, topics: List[str], pending_orders: Optional[List[Dict]] = None):
+        """Send fresh snapshots for subscribed topics, after the client saw a gap in their seq"""
+        for topic in topics:
+            if topic in websocket.topics:
+                self._send_snapshot(websocket, topic, pending_orders)
+
+    def _add_topics(self, websocket, topics, pending_orders: Optional[List[Dict]] = None):
+        for topic in topics:
+            if self.registry.add_topic(websocket, topic):
+                self._send_snapshot(websocket, topic, pending_orders)
+
+    def _send_snapshot(self, websocket, topic: str, pending_orders: Optional[List[Dict]] = None):
+        """
+        Current state of a topic, stamped with the seq of the topic's last frame: later
+        frames continue from it. Built without awaiting, so no frame of the topic can be
+        queued between the snapshot and the deltas that follow it.
+        """
+        websocket.send_message({
+            "type": "snapshot",
+            "version": SNAPSHOT_VERSION,
+            "topic": topic,
+            "seq": self.topic_seqs.get(routing_key(topic, websocket.user_id), 0),
+            "timestamp": now_ms(),
+            "data": self._snapshot_data(websocket.user_id, topic, pending_orders)
+        })
+
+    def _snapshot_data(self, user_id: Optional[str], topic: str, pending_orders: Optional[List[Dict]]):
+        parts = topic.split(":")
+        if parts[0] == "prices":
+            return self.prices.get(parts[1])
+        if parts[0] == "candles":
+            return {"candles": self.get_candles(parts[1], parts[2], settings.WS_CANDLE_SNAPSHOT_SIZE)}
+        if topic == ACCOUNT:
+            return self._get_account_snapshot(user_id)
+        
+        data = {"positions": self._user_position_rows(user_id)}
+        if pending_orders is not None:
+            data["orders"] = pending_orders
+        if settings.POSITION_STREAM_INCLUDE_ACCOUNT:
+            account = self._get_account_snapshot(user_id)
+            if account:
+                data["account"] = account
+        return data
+
+    def _user_position_rows(self, user_id: str) -> List[Dict]:
+        """A user's open positions as positions_update rows at the latest quotes"""
+        rows = []
+        for trade in self.user_positions.get(user_id, {}).values():
+            row = self._position_row(trade)
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def _position_row(self, trade) -> Optional[Dict]:
+        """A cached position as a positions_update row, without P&L until its symbol has a quote"""
+        book = self.position_books.get(trade.symbol)
+        if book is None:
+            return None
+        price = self.prices.get(trade.symbol)
+        if price is None:
+            row = book.row_by_id.get(str(trade.id))
+            return dict(book.stream_fields[row]) if row is not None else None
+        return book.stream_row(str(trade.id), price["bid"], price["ask"])
+
+    def get_candles(self, symbol: str, timeframe: str, limit: int = 500) -> List[Dict]:
+        """Most recent in-memory candles, oldest first"""
+        return self.candles.get_candles(symbol, timeframe, limit)
 
     async def refresh_position_cache(self):
-        """Manually refresh position cache"""
+        """Manually reconcile position cache with the database"""
         await self._update_position_cache()
         logger.info("Position cache manually refreshed")
 
@@ -860,16 +1366,9 @@ class PriceService:
             "total_positions": total_positions,
             "pending_orders": pending_orders,
             "last_update": self.last_position_cache_update.isoformat(),
-            "cache_age_seconds": (datetime.now() - self.last_position_cache_update).total_seconds()
+            "cache_age_seconds": (datetime.now() - self.last_position_cache_update).total_seconds(),
+            "last_reconcile_drift": self.last_reconcile_drift,
+            "margin": self.margin_engine.get_stats(),
+            "connections": self.registry.get_stats(),
+            "tick_recorder": self.tick_recorder.get_stats() if self.tick_recorder else None
         }
-    async def get_contract_size(self, symbol: str) -> float:
-            """
-            Get contract size for different symbols.
-            """
-            contract_sizes = {
-                "EURUSD": 100000,
-                "USDJPY": 100000,
-                "XAUUSD": 100,  # Gold is typically 100 oz per lot
-                # Add more symbols as needed
-            }
-            return contract_sizes.get(symbol, 100000)  
\ No newline at end of file
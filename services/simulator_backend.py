@@ -0,0 +1,138 @@
+import asyncio
+import csv
+import itertools
+import logging
+import math
+import random
+import time
+from typing import Optional, Dict, Any, List
+
+from config import settings
+from services.market_backend import MarketDataBackend
+from services.symbol_registry import symbol_registry
+
+logger = logging.getLogger(__name__)
+
+# symbol -> starting mid price; point sizes come from the symbol registry
+DEFAULT_START_PRICES: Dict[str, float] = {
+    "EURUSD": 1.08500,
+    "USDJPY": 150.000,
+    "XAUUSD": 2350.00,
+}
+
+
+class SimulatorBackend(MarketDataBackend):
+    """
+    Deterministic local stand-in for the MT5 terminal.
+
+    Every get_symbol_price call produces the next tick for that symbol, either
+    from a seeded random walk or from a replay CSV (symbol,time,bid,ask[,volume])
+    that loops when exhausted. Market orders fill at the current bid/ask plus a
+    random adverse slippage of up to SIMULATOR_SLIPPAGE_POINTS points, after
+    SIMULATOR_FILL_LATENCY_MS.
+    """
+
+    def __init__(self):
+        self.connected = False
+        self.rng = random.Random(settings.SIMULATOR_SEED)
+        self.volatility = settings.SIMULATOR_VOLATILITY
+        self.spread_points = settings.SIMULATOR_SPREAD_POINTS
+        self.slippage_points = settings.SIMULATOR_SLIPPAGE_POINTS
+        self.fill_latency = settings.SIMULATOR_FILL_LATENCY_MS / 1000
+        self.tick_latency = settings.SIMULATOR_TICK_LATENCY_MS / 1000
+
+        self.mids: Dict[str, float] = {}
+        self.last_ticks: Dict[str, Dict[str, float]] = {}
+        self.replay: Dict[str, List[Dict[str, float]]] = {}
+        self.replay_positions: Dict[str, int] = {}
+        self.clock_msc = int(time.time() * 1000)
+        self.tickets = itertools.count(1_000_000)
+
+        if settings.SIMULATOR_REPLAY_FILE:
+            self._load_replay(settings.SIMULATOR_REPLAY_FILE)
+
+    def _load_replay(self, path: str):
+        """Load replay ticks grouped by symbol, in file order"""
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                self.replay.setdefault(row["symbol"], []).append({
+                    "bid": float(row["bid"]),
+                    "ask": float(row["ask"]),
+                    "time": int(float(row["time"])),
+                    "volume": float(row.get("volume") or 0)
+                })
+        logger.info(f"Simulator replaying {sum(len(t) for t in self.replay.values())} ticks from {path}")
+
+    async def connect(self) -> bool:
+        self.connected = True
+        logger.info("Simulator backend connected")
+        return True
+
+    async def disconnect(self):
+        self.connected = False
+        logger.info("Simulator backend disconnected")
+
+    def next_tick(self, symbol: str) -> Dict[str, float]:
+        """Advance the symbol by one tick (synchronous, used by benchmarks too)"""
+        self.clock_msc += 1
+        replay = self.replay.get(symbol)
+        if replay:
+            position = self.replay_positions.get(symbol, 0)
+            tick = dict(replay[position % len(replay)])
+            self.replay_positions[symbol] = position + 1
+            tick["time_msc"] = tick["time"] * 1000
+        else:
+            spec = symbol_registry.get(symbol)
+            mid = self.mids.get(symbol) or DEFAULT_START_PRICES.get(symbol, 1.0)
+            mid *= math.exp(self.volatility * self.rng.gauss(0.0, 1.0))
+            self.mids[symbol] = mid
+            half_spread = self.spread_points * spec.point / 2
+            tick = {
+                "bid": round(mid - half_spread, spec.digits),
+                "ask": round(mid + half_spread, spec.digits),
+                "time": self.clock_msc // 1000,
+                "time_msc": self.clock_msc,
+                "volume": float(self.rng.randint(1, 10))
+            }
+        self.last_ticks[symbol] = tick
+        return tick
+
+    async def get_symbol_price(self, symbol: str) -> Optional[Dict[str, float]]:
+        if self.tick_latency:
+            await asyncio.sleep(self.tick_latency)
+        return self.next_tick(symbol)
+
+    async def get_symbol_prices(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        if self.tick_latency:
+            await asyncio.sleep(self.tick_latency)
+        return {symbol: self.next_tick(symbol) for symbol in symbols}
+
+    async def _fill(self, symbol: str, side: str, volume: float, comment: str) -> Optional[Dict[str, Any]]:
+        """Fill a market order against the last tick with adverse slippage"""
+        if self.fill_latency:
+            await asyncio.sleep(self.fill_latency)
+
+        tick = self.last_ticks.get(symbol) or self.next_tick(symbol)
+        slippage = self.rng.randint(0, self.slippage_points) * symbol_registry.get(symbol).point if self.slippage_points else 0.0
+        price = tick["ask"] + slippage if side == "buy" else tick["bid"] - slippage
+
+        return {
+            "ticket": str(next(self.tickets)),
+            "price": price,
+            "volume": volume,
+            "retcode": 10009,  # TRADE_RETCODE_DONE
+            "comment": comment
+        }
+
+    async def place_order(self, symbol: str, order_type: str, volume: float,
+                          price: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        result = await self._fill(symbol, order_type, volume, "Simulator Market Order")
+        logger.info(f"✅ Simulated market order executed: {result['ticket']} at {result['price']}")
+        return result
+
+    async def close_position(self, ticket: str, symbol: str, volume: float,
+                             position_type: str) -> Optional[Dict[str, Any]]:
+        close_side = "sell" if position_type == "buy" else "buy"
+        result = await self._fill(symbol, close_side, volume, "Simulator Close")
+        logger.info(f"✅ Simulated position closed: {ticket} at {result['price']}")
+        return result
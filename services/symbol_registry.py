@@ -0,0 +1,89 @@
+import json
+import logging
+import os
+from dataclasses import asdict, dataclass, replace
+from typing import Dict
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SymbolSpec:
+    """Immutable per-symbol trading constants used by P&L, margin and pip code"""
+    symbol: str
+    contract_size: float   # units per lot
+    point_value: float     # multiplier applied to price diff * volume * contract size
+    pip_multiplier: float  # price difference -> pips
+    point: float           # smallest price increment
+    digits: int
+
+
+def default_spec(symbol: str) -> SymbolSpec:
+    """Built-in constants, used until the terminal or a spec file says otherwise"""
+    if "JPY" in symbol:
+        return SymbolSpec(symbol, contract_size=100000, point_value=0.01, pip_multiplier=100, point=0.001, digits=3)
+    if symbol == "XAUUSD":
+        # Gold is typically 100 oz per lot, 1 pip = $0.10 per 0.01 move
+        return SymbolSpec(symbol, contract_size=100, point_value=0.1, pip_multiplier=10, point=0.01, digits=2)
+    return SymbolSpec(symbol, contract_size=100000, point_value=1, pip_multiplier=10000, point=0.00001, digits=5)
+
+
+class SymbolRegistry:
+    """
+    Per-symbol specifications, loaded once at startup and read synchronously.
+
+    Sources are layered: built-in defaults, then the terminal's symbol_info
+    (contract size, point, digits), then SYMBOL_SPECS_FILE if configured.
+    With the price board, workers have no terminal connection for quotes and
+    load what the feed process read from it (PRICE_BOARD_SPECS_FILE) instead.
+    """
+
+    def __init__(self):
+        self.specs: Dict[str, SymbolSpec] = {symbol: default_spec(symbol) for symbol in settings.SYMBOLS}
+
+    def get(self, symbol: str) -> SymbolSpec:
+        spec = self.specs.get(symbol)
+        if spec is None:
+            spec = self.specs[symbol] = default_spec(symbol)
+        return spec
+
+    async def load(self, backend=None):
+        """Populate specs from the market backend (if given) and the optional spec file"""
+        for symbol in settings.SYMBOLS if backend else []:
+            try:
+                info = await backend.get_symbol_info(symbol)
+            except Exception as e:
+                logger.error(f"Failed to load symbol info for {symbol}: {e}")
+                continue
+            if info:
+                self.specs[symbol] = replace(
+                    self.get(symbol),
+                    contract_size=info["contract_size"],
+                    point=info["point"],
+                    digits=info["digits"]
+                )
+
+        if settings.SYMBOL_SPECS_FILE:
+            self.load_file(settings.SYMBOL_SPECS_FILE)
+
+        logger.info(f"Symbol registry loaded: {', '.join(sorted(self.specs))}")
+
+    def save_file(self, path: str):
+        """Write every spec as JSON in the load_file() format, replacing the file atomically"""
+        specs = {symbol: {k: v for k, v in asdict(spec).items() if k != "symbol"} for symbol, spec in self.specs.items()}
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(specs, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def load_file(self, path: str):
+        """Apply overrides from JSON: {"EURUSD": {"contract_size": 100000, ...}}"""
+        with open(path) as f:
+            overrides = json.load(f)
+        for symbol, fields in overrides.items():
+            self.specs[symbol] = replace(self.get(symbol), **fields)
+
+
+symbol_registry = SymbolRegistry()
@@ -0,0 +1,191 @@
+import MetaTrader5 as mt5
+from typing import Optional, Dict, Any, List
+import logging
+from config import settings
+from services.market_backend import MarketDataBackend
+from services.mt5_gateway import gateway
+
+logger = logging.getLogger(__name__)
+
+class TerminalBackend(MarketDataBackend):
+    """MetaTrader 5 terminal, every call routed through the MT5 gateway thread"""
+
+    def __init__(self):
+        self.connected = False
+    
+    async def connect(self):
+        """Connect to MetaTrader 5"""
+        try:
+            initialized = await gateway.call(mt5.initialize)
+        except Exception as e:
+            logger.error(f"MT5 initialization error: {e}")
+            return False
+        
+        if not initialized:
+            logger.error("MT5 initialization failed")
+            return False
+        
+        self.connected = True
+        logger.info("MT5 connected successfully")
+        return True
+    
+    async def disconnect(self):
+        """Disconnect from MetaTrader 5"""
+        await gateway.call(mt5.shutdown)
+        self.connected = False
+        logger.info("MT5 disconnected")
+    
+    async def place_order(self, symbol: str, order_type: str, volume: float, 
+                         price: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """✅ FIXED: Place MARKET order only (no SL/TP parameters accepted)"""
+        if not self.connected:
+            await self.connect()
+        
+        try:
+            # Check symbol availability
+            symbol_info = await gateway.call(mt5.symbol_info, symbol)
+            if symbol_info is None:
+                logger.error(f"Symbol {symbol} not found")
+                return None
+            
+            # ✅ FIXED: Only send MARKET orders to MT5
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": symbol,
+                "volume": volume,
+                "type": mt5.ORDER_TYPE_BUY if order_type == "buy" else mt5.ORDER_TYPE_SELL,
+                "deviation": 20,
+                "magic": 123456,
+                "comment": "FastAPI Market Order",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+            
+            # ✅ REMOVED: No price, sl, tp parameters - only market execution
+            # We handle SL/TP on our backend, not on MT5
+            
+            # Send order
+            result = await gateway.call(mt5.order_send, request, timeout=settings.MT5_ORDER_TIMEOUT, abandon=False)
+            
+            if result.retcode != mt5.TRADE_RETCODE_DONE:
+                logger.error(f"MT5 order failed: {result.comment}")
+                return None
+            
+            logger.info(f"✅ MT5 market order executed: {result.order} at {result.price}")
+            
+            return {
+                "ticket": str(result.order),
+                "price": result.price,
+                "volume": result.volume,
+                "retcode": result.retcode,
+                "comment": result.comment
+            }
+            
+        except Exception as e:
+            logger.error(f"MT5 order placement error: {e}")
+            return None
+    
+    async def close_position(self, ticket: str, symbol: str, volume: float, 
+                           position_type: str) -> Optional[Dict[str, Any]]:
+        """✅ Close position on MT5 (market order for closing)"""
+        if not self.connected:
+            await self.connect()
+        
+        try:
+            # Reverse the position type for closing
+            close_type = mt5.ORDER_TYPE_SELL if position_type == "buy" else mt5.ORDER_TYPE_BUY
+            
+            request = {
+                "action": mt5.TRADE_ACTION_DEAL,
+                "symbol": symbol,
+                "volume": volume,
+                "type": close_type,
+                "position": int(ticket),
+                "deviation": 20,
+                "magic": 123456,
+                "comment": "FastAPI Close",
+                "type_time": mt5.ORDER_TIME_GTC,
+                "type_filling": mt5.ORDER_FILLING_IOC,
+            }
+            
+            result = await gateway.call(mt5.order_send, request, timeout=settings.MT5_ORDER_TIMEOUT, abandon=False)
+            
+            if result.retcode != mt5.TRADE_RETCODE_DONE:
+                logger.error(f"MT5 close failed: {result.comment}")
+                return None
+            
+            logger.info(f"✅ MT5 position closed: {ticket} at {result.price}")
+            
+            return {
+                "ticket": str(result.order),
+                "price": result.price,
+                "volume": result.volume,
+                "retcode": result.retcode,
+                "comment": result.comment
+            }
+            
+        except Exception as e:
+            logger.error(f"MT5 position close error: {e}")
+            return None
+    
+    async def get_symbol_price(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Get current price for symbol"""
+        if not self.connected:
+            await self.connect()
+        
+        try:
+            tick = await gateway.call(mt5.symbol_info_tick, symbol)
+            if tick is None:
+                return None
+            
+            return _tick_to_dict(tick)
+        except Exception as e:
+            logger.error(f"Price fetch error: {e}")
+            return None
+    
+    async def get_symbol_info(self, symbol: str) -> Optional[Dict[str, float]]:
+        """Read the symbol specification from the terminal"""
+        if not self.connected:
+            await self.connect()
+        
+        info = await gateway.call(mt5.symbol_info, symbol)
+        if info is None:
+            logger.error(f"Symbol {symbol} not found")
+            return None
+        
+        return {
+            "contract_size": info.trade_contract_size,
+            "point": info.point,
+            "digits": info.digits
+        }
+    
+    async def get_symbol_prices(self, symbols: List[str]) -> Dict[str, Dict[str, float]]:
+        """Get current prices for many symbols in one gateway round-trip"""
+        if not self.connected:
+            await self.connect()
+        
+        try:
+            return await gateway.call(_read_ticks, symbols)
+        except Exception as e:
+            logger.error(f"Batched price fetch error: {e}")
+            return {}
+
+
+def _tick_to_dict(tick) -> Dict[str, float]:
+    return {
+        "bid": tick.bid,
+        "ask": tick.ask,
+        "time": tick.time,
+        "time_msc": getattr(tick, 'time_msc', tick.time * 1000),
+        "volume": getattr(tick, 'volume', 0)
+    }
+
+
+def _read_ticks(symbols: List[str]) -> Dict[str, Dict[str, float]]:
+    """Runs on the gateway thread: read every symbol's tick in one queued call"""
+    ticks = {}
+    for symbol in symbols:
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is not None:
+            ticks[symbol] = _tick_to_dict(tick)
+    return ticks
\ No newline at end of file
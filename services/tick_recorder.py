@@ -0,0 +1,102 @@
+import logging
+import os
+import struct
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# One tick per record: time_msc (int64), bid, ask, volume (float64), little-endian
+TICK_RECORD = struct.Struct("<qddd")
+
+MS_PER_DAY = 86_400_000
+
+
+def day_file_path(directory: str, symbol: str, day: int) -> str:
+    """Path of the tick file for a symbol and a UTC day number (days since the epoch)"""
+    date = datetime.fromtimestamp(day * 86_400, tz=timezone.utc).strftime("%Y-%m-%d")
+    return os.path.join(directory, symbol, f"{date}.ticks")
+
+
+class TickRecorder:
+    """
+    Appends every processed tick to <TICK_RECORD_DIR>/<symbol>/<YYYY-MM-DD>.ticks.
+
+    record() only packs the tick into an in-memory buffer; a background thread
+    swaps the buffers out every TICK_RECORD_FLUSH_INTERVAL seconds, appends them
+    to their day files and fsyncs once per batch, so the event loop never
+    touches the disk.
+    """
+
+    def __init__(self, directory: str = settings.TICK_RECORD_DIR,
+                 flush_interval: float = settings.TICK_RECORD_FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.buffers: Dict[Tuple[str, int], bytearray] = {}
+        self.ticks_recorded = 0
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background writer thread"""
+        if self._thread is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tick-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"✅ Recording ticks to {self.directory}")
+
+    def stop(self):
+        """Stop the writer thread after a final flush"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def record(self, symbol: str, tick: Dict):
+        """Buffer one tick; called from the price loop"""
+        time_msc = int(tick.get("time_msc") or tick.get("time", 0) * 1000)
+        key = (symbol, time_msc // MS_PER_DAY)
+        record = TICK_RECORD.pack(time_msc, tick["bid"], tick["ask"], tick.get("volume", 0.0))
+        with self._lock:
+            buffer = self.buffers.get(key)
+            if buffer is None:
+                buffer = self.buffers[key] = bytearray()
+            buffer += record
+        self.ticks_recorded += 1
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        """Write out everything buffered so far, one fsync per day file"""
+        with self._lock:
+            buffers, self.buffers = self.buffers, {}
+
+        for (symbol, day), buffer in buffers.items():
+            path = day_file_path(self.directory, symbol, day)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "ab") as f:
+                    f.write(buffer)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.bytes_written += len(buffer)
+            except OSError as e:
+                logger.error(f"Failed to write ticks to {path}: {e}")
+
+    def get_stats(self) -> Dict:
+        return {
+            "directory": self.directory,
+            "ticks_recorded": self.ticks_recorded,
+            "bytes_written": self.bytes_written
+        }
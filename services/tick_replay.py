@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import mmap
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Same layout as tick_recorder.TICK_RECORD, so a day file maps straight onto an array
+TICK_DTYPE = np.dtype([("time_msc", "<i8"), ("bid", "<f8"), ("ask", "<f8"), ("volume", "<f8")])
+
+
+class TickFile:
+    """Read-only memory map of one recorded day file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        # A crash mid-write can leave a partial record at the end
+        count = size // TICK_DTYPE.itemsize
+        if count:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.ticks = np.frombuffer(self._mmap, dtype=TICK_DTYPE, count=count)
+        else:
+            self._mmap = None
+            self.ticks = np.empty(0, dtype=TICK_DTYPE)
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def close(self):
+        self.ticks = None
+        if self._mmap is not None:
+            self._mmap.close()
+        self._file.close()
+
+
+class TickReplay:
+    """
+    Feeds recorded ticks through PriceService.ingest_ticks, the same path live
+    ticks take: daily stats, trigger evaluation, price and P&L broadcasts.
+
+    Ticks from all symbols are merged in time order. speed=1.0 replays in real
+    time, speed=N runs N times faster and speed=None as fast as possible. Ticks
+    that are due together go through as one round, at most one per symbol.
+    """
+
+    def __init__(self, price_service, files: Dict[str, str], speed: Optional[float] = 1.0):
+        self.price_service = price_service
+        self.speed = speed or None
+        self.files = {symbol: TickFile(path) for symbol, path in files.items()}
+        self.symbols: List[str] = list(self.files)
+
+        # Merge all symbols into one time-ordered sequence of (symbol index, row)
+        times = [tick_file.ticks["time_msc"] for tick_file in self.files.values()]
+        times.append(np.empty(0, dtype=np.int64))
+        order = np.argsort(np.concatenate(times), kind="stable")
+        self.times = np.concatenate(times)[order]
+        self.owners = np.concatenate([np.full(len(t), i, dtype=np.int32) for i, t in enumerate(times)])[order]
+        self.rows = np.concatenate([np.arange(len(t)) for t in times])[order]
+
+    @classmethod
+    def from_day(cls, price_service, directory: str, day: str,
+                 symbols: Optional[List[str]] = None, speed: Optional[float] = 1.0) -> "TickReplay":
+        """Replay <directory>/<symbol>/<day>.ticks for every symbol that has a file"""
+        if symbols is None:
+            symbols = sorted(os.listdir(directory))
+        files = {}
+        for symbol in symbols:
+            path = os.path.join(directory, symbol, f"{day}.ticks")
+            if os.path.exists(path):
+                files[symbol] = path
+        return cls(price_service, files, speed)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _tick(self, index: int) -> Dict:
+        symbol = self.symbols[self.owners[index]]
+        time_msc, bid, ask, volume = self.files[symbol].ticks[self.rows[index]].tolist()
+        return {"bid": bid, "ask": ask, "time": time_msc // 1000, "time_msc": time_msc, "volume": volume}
+
+    async def run(self) -> Dict:
+        """Replay every tick; returns tick count, rounds, elapsed seconds and ticks/s"""
+        total = len(self.times)
+        index = 0
+        rounds = 0
+        started = time.perf_counter()
+        first_msc = int(self.times[0]) if total else 0
+
+        while index < total:
+            if self.speed:
+                due_msc = first_msc + (time.perf_counter() - started) * 1000 * self.speed
+                if self.times[index] > due_msc:
+                    await asyncio.sleep((self.times[index] - due_msc) / 1000 / self.speed)
+                    continue
+
+            ticks: Dict[str, Dict] = {}
+            while index < total:
+                if self.speed and self.times[index] > due_msc:
+                    break
+                symbol = self.symbols[self.owners[index]]
+                if symbol in ticks:
+                    break
+                ticks[symbol] = self._tick(index)
+                index += 1
+
+            await self.price_service.ingest_ticks(ticks, record=False)
+            rounds += 1
+            # Like the live loop between polls, let client writer tasks drain their queues
+            await asyncio.sleep(0)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"✅ Replayed {total} ticks in {elapsed:.2f}s")
+        return {
+            "ticks": total,
+            "rounds": rounds,
+            "elapsed": elapsed,
+            "ticks_per_second": total / elapsed if elapsed else 0.0
+        }
+
+    def close(self):
+        for tick_file in self.files.values():
+            tick_file.close()
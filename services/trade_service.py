@@ -873,9 +873,11 @@
 # services/trade_service.py - CORRECTED VERSION
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_
-from typing import List, Optional, Dict
+from sqlalchemy import select, and_, or_, func
+from typing import List, Optional, Dict, Set
+import asyncio
 import uuid
+import time
 from datetime import datetime
 import logging
 
@@ -883,7 +885,15 @@ from models.trade import Trade, TradeStatus, TradeType, OrderType
 from models.user import User
 from schemas.trade import TradeCreate, PositionResponse
 from services.mt5_service import MT5Service
-from services.price_service import PriceService
+from services.price_service import OrderEvent, PriceService, PositionEvent
+from services.trigger_index import PriceTriggerIndex
+from services.symbol_registry import symbol_registry
+from services.metrics import get_histogram
+from services.leader_election import leader
+from services.margin_engine import account_figures
+from services.event_bus import event_bus
+from database import async_session
+from config import settings
 from fastapi import HTTPException, status
 logger = logging.getLogger(__name__)
 
@@ -892,6 +902,15 @@ class TradeService:
         self.mt5_service = MT5Service()
         self.price_service = price_service
         self.pending_limit_orders: Dict[str, Trade] = {}  # Store pending limit orders
+        # symbol -> {user side -> trigger index}; buy limits fire on ask <= target, sell limits on bid >= target
+        self.limit_triggers: Dict[str, Dict[TradeType, PriceTriggerIndex]] = {}
+        # symbol -> {(user side, "sl"/"tp") -> trigger index} for open positions, keyed by trade id
+        self.sl_tp_triggers: Dict[str, Dict[tuple, PriceTriggerIndex]] = {}
+        # Ids of triggered orders/positions still executing, kept out of index rebuilds
+        self.in_flight_triggers: Set[str] = set()
+        self._trigger_tasks: Set[asyncio.Task] = set()  # executions dispatched from the tick path
+        # Orders and positions changed in other workers reach the leader's indexes through the bus
+        event_bus.subscribe("trade_changed", self._on_trade_changed)
         self.commission_per_lot = 6.0  # $6 commission per lot
     
     async def place_trade(self, db: AsyncSession, user: User, trade_data: TradeCreate) -> Trade:
@@ -947,6 +966,9 @@ class TradeService:
             await db.commit()
             await db.refresh(trade)
             
+            self.publish_trade_changed(trade)
+            if trade.status == TradeStatus.PENDING:
+                self.price_service.publish_order_event(OrderEvent.PLACED, str(trade.users_id), self.pending_order_payload(trade))
             return trade
             
         except Exception as e:
@@ -982,6 +1004,9 @@ class TradeService:
             await db.commit()
             await db.refresh(trade)
 
+            self.price_service.update_account_balance(str(user.id), user.balance)
+            self.price_service.publish_position_event(PositionEvent.OPENED, trade)
+            self.track_position_levels(trade)
             
             logger.info(f"Market order executed: {trade.ticket}, Margin: ${margin_required:.2f} (Leverage: {user.leverage}:1), Commission: ${commission:.2f}")
             
@@ -1008,7 +1033,7 @@ class TradeService:
         
         # Check if user has sufficient balance for when order executes
         # margin_required = trade.volume * 1000
-        contract_size = await self.get_contract_size(trade.symbol)
+        contract_size = symbol_registry.get(trade.symbol).contract_size
         current_price = (current_price["bid"] + current_price["ask"]) / 2 
         margin_required = (trade.volume * contract_size * current_price) / user.leverage
         total_required = margin_required + commission
@@ -1017,67 +1042,28 @@ class TradeService:
             raise Exception(f"Insufficient balance for order. Required: ${total_required:.2f}")
         
         # ✅ Store pending order for monitoring (NO MT5 EXECUTION YET)
-        self.pending_limit_orders[trade.ticket] = trade
+        self.track_pending_order(trade)
         trade.status = TradeStatus.PENDING
         
         logger.info(f"Limit order stored locally: {trade.ticket} - {trade.user_type} {trade.symbol} at {target_price} (will execute on our backend when price reached)")
     
-    async def monitor_pending_orders(self, db: AsyncSession):
-        """✅ Monitor pending limit orders for execution"""
-        if not self.pending_limit_orders:
-            return
-        
-        executed_orders = []
-        
-        for ticket, trade in self.pending_limit_orders.items():
-            try:
-                current_price = await self.price_service.get_price(trade.symbol)
-                if not current_price:
-                    continue
-                
-                target_price = trade.entry_price
-                current_market_price = current_price["ask"] if trade.user_type == TradeType.BUY else current_price["bid"]
-                
-                # Check if limit order should execute
-                should_execute = False
-                
-                if trade.user_type == TradeType.BUY and current_market_price <= target_price:
-                    should_execute = True
-                elif trade.user_type == TradeType.SELL and current_market_price >= target_price:
-                    should_execute = True
-                
-                if should_execute:
-                    logger.info(f"LIMIT ORDER TRIGGERED: {ticket} - executing as market order")
-                    
-                    # Get fresh user data
-                    user_result = await db.execute(select(User).where(User.id == trade.users_id))
-                    user = user_result.scalar_one()
-                    
-                    # ✅ Execute the trade immediately (will go to MT5 as market order for real users)
-                    commission = trade.volume * self.commission_per_lot
-                    await self._execute_trade_immediately(trade, user, db, trade.margin_required, commission)
-                    
-                    # Update database
-                    await db.commit()
-                    
-                    executed_orders.append(ticket)
-                    
-                    logger.info(f"LIMIT ORDER EXECUTED: {ticket} - now executed as market order")
-                    
-            except Exception as e:
-                logger.error(f"Error executing limit order {ticket}: {e}")
-                continue
-                # trade.status = TradeStatus.CANCELLED
-                # executed_orders.append(ticket)
-        
-        # Remove executed/cancelled orders from pending
-        for ticket in executed_orders:
-            self.pending_limit_orders.pop(ticket, None)
-    
-    async def monitor_stop_loss_take_profit(self, db: AsyncSession):
-        """✅ Monitor open positions for SL/TP triggers"""
-        try:
-            # Get all open positions with SL or TP set
+    async def load_trigger_indexes(self):
+        """
+        Rebuild the limit-order and SL/TP indexes from the database. Run by the
+        leader when elected and periodically, so orders placed or changed in
+        other workers are picked up.
+        """
+        async with async_session() as db:
+            result = await db.execute(
+                select(Trade).where(
+                    and_(
+                        Trade.status == TradeStatus.PENDING,
+                        Trade.order_type == OrderType.LIMIT
+                    )
+                )
+            )
+            pending = result.scalars().all()
+            
             result = await db.execute(
                 select(Trade).where(
                     and_(
@@ -1089,48 +1075,292 @@ class TradeService:
                     )
                 )
             )
-            open_trades = result.scalars().all()
+            positions = result.scalars().all()
+        
+        # Swap in one go, without awaiting, so no tick sees a half-built index
+        self.clear_trigger_indexes()
+        for trade in pending:
+            if str(trade.id) not in self.in_flight_triggers:
+                self.track_pending_order(trade)
+        for trade in positions:
+            if str(trade.id) not in self.in_flight_triggers:
+                self.track_position_levels(trade)
+        logger.debug(f"Indexed {len(self.pending_limit_orders)} pending limit orders and SL/TP for {len(positions)} open positions")
+
+    def publish_trade_changed(self, trade: Trade):
+        """Tell the leader (in whichever worker it runs) to re-index this order or position"""
+        event_bus.publish("trade_changed", {"trade_id": str(trade.id)}, remote_only=True)
+
+    async def _on_trade_changed(self, data: Dict):
+        """Re-index one order or position from its database row (leader only)"""
+        if not leader.is_leader or data["trade_id"] in self.in_flight_triggers:
+            return
+        
+        async with async_session() as db:
+            trade = await db.get(Trade, uuid.UUID(data["trade_id"]))
+        if trade is None or data["trade_id"] in self.in_flight_triggers:
+            return
+        
+        if trade.status == TradeStatus.PENDING and trade.order_type == OrderType.LIMIT:
+            self.track_pending_order(trade)
+            return
+        
+        self.untrack_pending_order(trade.ticket)
+        if trade.status == TradeStatus.EXECUTED:
+            self.track_position_levels(trade)
+        else:
+            self.untrack_position_levels(trade)
+
+    def clear_trigger_indexes(self):
+        """Drop every indexed limit order and SL/TP level"""
+        self.pending_limit_orders = {}
+        self.limit_triggers = {}
+        self.sl_tp_triggers = {}
+
+    def track_pending_order(self, trade: Trade):
+        """Store a pending limit order and index its target price (leader only)"""
+        if not leader.is_leader:
+            return
+        self.pending_limit_orders[trade.ticket] = trade
+        
+        triggers = self.limit_triggers.get(trade.symbol)
+        if triggers is None:
+            triggers = {
+                TradeType.BUY: PriceTriggerIndex(PriceTriggerIndex.AT_OR_BELOW),
+                TradeType.SELL: PriceTriggerIndex(PriceTriggerIndex.AT_OR_ABOVE),
+            }
+            self.limit_triggers[trade.symbol] = triggers
+        triggers[trade.user_type].add(trade.ticket, trade.entry_price, trade)
+
+    def untrack_pending_order(self, ticket: str) -> Optional[Trade]:
+        """Stop monitoring a pending limit order (cancelled or executed)"""
+        trade = self.pending_limit_orders.pop(ticket, None)
+        if trade is not None:
+            triggers = self.limit_triggers.get(trade.symbol)
+            if triggers is not None:
+                triggers[trade.user_type].remove(ticket)
+        return trade
+
+    def _pop_triggered_limit_orders(self, symbol: str, current_price: Dict) -> List[Trade]:
+        """Take the limit orders this quote crossed out of the index"""
+        triggers = self.limit_triggers.get(symbol)
+        if not triggers:
+            return []
+        triggered = triggers[TradeType.BUY].pop_crossed(current_price["ask"])
+        triggered += triggers[TradeType.SELL].pop_crossed(current_price["bid"])
+        self.in_flight_triggers.update(str(trade.id) for trade in triggered)
+        return triggered
+
+    async def _execute_limit_order(self, db: AsyncSession, trade: Trade) -> bool:
+        """Execute a triggered limit order as a market order, re-index it on failure"""
+        ticket = trade.ticket
+        indexed = trade
+        try:
+            # Lock and re-read the row: the indexed copy may have filled or been cancelled since it was indexed
+            result = await db.execute(select(Trade).where(Trade.id == trade.id).with_for_update())
+            fresh_trade = result.scalar_one_or_none()
+            if not fresh_trade or fresh_trade.status != TradeStatus.PENDING:
+                self.pending_limit_orders.pop(ticket, None)
+                logger.info(f"Limit order {ticket} is no longer pending, not executing it")
+                return False
+            trade = fresh_trade
+            order = self.pending_order_payload(trade)
             
-            for trade in open_trades:
-                try:
-                    current_price = await self.price_service.get_price(trade.symbol)
-                    if not current_price:
-                        continue
-                    
-                    # ✅ FIXED: Get current price relevant to user's position (not execution side)
-                    current_market_price = current_price["bid"] if trade.user_type == TradeType.BUY else current_price["ask"]
-                    
-                    should_close = False
-                    close_reason = ""
-                    
-                    # ✅ Check Stop Loss from USER perspective
-                    if trade.stop_loss:
-                        if trade.user_type == TradeType.BUY and current_market_price <= trade.stop_loss:
-                            should_close = True
-                            close_reason = "Stop Loss"
-                        elif trade.user_type == TradeType.SELL and current_market_price >= trade.stop_loss:
-                            should_close = True
-                            close_reason = "Stop Loss"
-                    
-                    # ✅ Check Take Profit from USER perspective
-                    if trade.take_profit:
-                        if trade.user_type == TradeType.BUY and current_market_price >= trade.take_profit:
-                            should_close = True
-                            close_reason = "Take Profit"
-                        elif trade.user_type == TradeType.SELL and current_market_price <= trade.take_profit:
-                            should_close = True
-                            close_reason = "Take Profit"
-                    
-                    if should_close:
-                        logger.info(f"Auto-closing position {trade.ticket} due to {close_reason}")
-                        await self.close_trade(db, trade, auto_close=True, close_reason=close_reason)
-                        
-                except Exception as e:
-                    logger.error(f"Error monitoring SL/TP for trade {trade.ticket}: {e}")
-                    
+            logger.info(f"LIMIT ORDER TRIGGERED: {ticket} - executing as market order")
+            
+            # Get fresh user data
+            user_result = await db.execute(select(User).where(User.id == trade.users_id))
+            user = user_result.scalar_one()
+            
+            # ✅ Execute the trade immediately (will go to MT5 as market order for real users)
+            commission = trade.volume * self.commission_per_lot
+            await self._execute_trade_immediately(trade, user, db, trade.margin_required, commission)
+            
+            # Update database
+            await db.commit()
+            
+            # Real executions replace the ticket with the MT5 one
+            self.pending_limit_orders.pop(ticket, None)
+            self.price_service.publish_order_event(OrderEvent.FILLED, str(trade.users_id), order)
+            
+            logger.info(f"LIMIT ORDER EXECUTED: {ticket} - now executed as market order")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error executing limit order {ticket}: {e}")
+            # Keep it pending and retry on the next tick
+            indexed.ticket = ticket
+            indexed.status = TradeStatus.PENDING
+            self.track_pending_order(indexed)
+            return False
+        
+        finally:
+            self.in_flight_triggers.discard(str(indexed.id))
+
+    def process_tick(self, symbols: List[str], tick_times: Dict[str, float]):
+        """
+        Evaluate limit orders and SL/TP for the symbols that just ticked.
+        The crossing check runs in the price pipeline; what it crossed executes in
+        a background task, so the tick never waits on the database or MT5.
+        """
+        limit_orders = []
+        positions = []
+        for symbol in symbols:
+            current_price = self.price_service.prices.get(symbol)
+            if not current_price:
+                continue
+            for trade in self._pop_triggered_limit_orders(symbol, current_price):
+                limit_orders.append((symbol, trade))
+            for trade in self._pop_crossed_positions(symbol, current_price):
+                positions.append((symbol, trade, current_price))
+        
+        if not limit_orders and not positions:
+            return
+        
+        task = asyncio.create_task(self._execute_triggers(limit_orders, positions, tick_times))
+        self._trigger_tasks.add(task)
+        task.add_done_callback(self._trigger_tasks.discard)
+
+    async def _execute_triggers(self, limit_orders: List[tuple], positions: List[tuple], tick_times: Dict[str, float]):
+        """
+        Execute one tick's crossed orders and positions; latency runs from the crossing tick.
+        Each gets its own session: ending one (a stale order's row lock, a failed fill) must not
+        expire the Trade instances another trigger already committed and handed to the caches.
+        """
+        try:
+            for symbol, trade in limit_orders:
+                async with async_session() as db:
+                    executed = await self._execute_limit_order(db, trade)
+                if executed:
+                    self._observe_trigger_latency("limit_order", tick_times.get(symbol))
+            
+            for symbol, trade, current_price in positions:
+                async with async_session() as db:
+                    close_reason = await self._close_crossed_position(db, trade, current_price)
+                if close_reason:
+                    self._observe_trigger_latency(
+                        "stop_loss" if close_reason == "Stop Loss" else "take_profit",
+                        tick_times.get(symbol)
+                    )
         except Exception as e:
-            logger.error(f"SL/TP monitoring error: {e}")
+            logger.error(f"Trigger execution error: {e}")
+            # Re-index whatever never got to run (e.g. no database session); it retries on the next tick
+            for _, trade in limit_orders:
+                if str(trade.id) in self.in_flight_triggers:
+                    self.in_flight_triggers.discard(str(trade.id))
+                    self.track_pending_order(trade)
+            for _, trade, _ in positions:
+                if str(trade.id) in self.in_flight_triggers:
+                    self.in_flight_triggers.discard(str(trade.id))
+                    self.track_position_levels(trade)
+
+    def _observe_trigger_latency(self, trigger: str, tick_time: Optional[float]):
+        """Record crossing-tick to execution latency for one trigger kind"""
+        if tick_time is not None:
+            get_histogram(f"trigger_latency.{trigger}").observe((time.perf_counter() - tick_time) * 1000)
     
+    def track_position_levels(self, trade: Trade):
+        """Index (or re-index) the SL/TP levels of an open position (leader only)"""
+        if not leader.is_leader:
+            return
+        self.untrack_position_levels(trade)
+        
+        triggers = self.sl_tp_triggers.get(trade.symbol)
+        if triggers is None:
+            # Buys close on bid: SL fires at or below, TP at or above.
+            # Sells close on ask: SL fires at or above, TP at or below.
+            triggers = {
+                (TradeType.BUY, "sl"): PriceTriggerIndex(PriceTriggerIndex.AT_OR_BELOW),
+                (TradeType.BUY, "tp"): PriceTriggerIndex(PriceTriggerIndex.AT_OR_ABOVE),
+                (TradeType.SELL, "sl"): PriceTriggerIndex(PriceTriggerIndex.AT_OR_ABOVE),
+                (TradeType.SELL, "tp"): PriceTriggerIndex(PriceTriggerIndex.AT_OR_BELOW),
+            }
+            self.sl_tp_triggers[trade.symbol] = triggers
+        
+        trade_id = str(trade.id)
+        if trade.stop_loss:
+            triggers[(trade.user_type, "sl")].add(trade_id, trade.stop_loss, trade)
+        if trade.take_profit:
+            triggers[(trade.user_type, "tp")].add(trade_id, trade.take_profit, trade)
+
+    def untrack_position_levels(self, trade: Trade):
+        """Drop a position's SL/TP levels from the index"""
+        triggers = self.sl_tp_triggers.get(trade.symbol)
+        if triggers is None:
+            return
+        trade_id = str(trade.id)
+        triggers[(trade.user_type, "sl")].remove(trade_id)
+        triggers[(trade.user_type, "tp")].remove(trade_id)
+
+    def _get_close_reason(self, trade: Trade, current_price: Dict) -> Optional[str]:
+        """Return "Stop Loss"/"Take Profit" if the price has crossed the position's levels"""
+        # ✅ FIXED: Get current price relevant to user's position (not execution side)
+        current_market_price = current_price["bid"] if trade.user_type == TradeType.BUY else current_price["ask"]
+        
+        close_reason = None
+        
+        # ✅ Check Stop Loss from USER perspective
+        if trade.stop_loss:
+            if trade.user_type == TradeType.BUY and current_market_price <= trade.stop_loss:
+                close_reason = "Stop Loss"
+            elif trade.user_type == TradeType.SELL and current_market_price >= trade.stop_loss:
+                close_reason = "Stop Loss"
+        
+        # ✅ Check Take Profit from USER perspective
+        if trade.take_profit:
+            if trade.user_type == TradeType.BUY and current_market_price >= trade.take_profit:
+                close_reason = "Take Profit"
+            elif trade.user_type == TradeType.SELL and current_market_price <= trade.take_profit:
+                close_reason = "Take Profit"
+        
+        return close_reason
+
+    def _pop_crossed_positions(self, symbol: str, current_price: Dict) -> List[Trade]:
+        """Take the positions whose SL or TP this quote crossed out of the index"""
+        triggers = self.sl_tp_triggers.get(symbol)
+        if not triggers:
+            return []
+        
+        crossed = {}
+        for (side, _), index in triggers.items():
+            price = current_price["bid"] if side == TradeType.BUY else current_price["ask"]
+            for trade in index.pop_crossed(price):
+                crossed[str(trade.id)] = trade
+        
+        # The other level of a crossed position must not fire again
+        for trade in crossed.values():
+            self.untrack_position_levels(trade)
+        self.in_flight_triggers.update(crossed)
+        return list(crossed.values())
+
+    async def _close_crossed_position(self, db: AsyncSession, trade: Trade, current_price: Dict) -> Optional[str]:
+        """Close a position whose SL/TP was crossed, returns the close reason if it closed"""
+        try:
+            # Lock and re-read the row so we never close a position that is already gone
+            result = await db.execute(select(Trade).where(Trade.id == trade.id).with_for_update())
+            fresh_trade = result.scalar_one_or_none()
+            if not fresh_trade or fresh_trade.status != TradeStatus.EXECUTED:
+                return None
+            
+            close_reason = self._get_close_reason(fresh_trade, current_price)
+            if not close_reason:
+                # Levels moved since they were indexed
+                self.track_position_levels(fresh_trade)
+                return None
+            
+            logger.info(f"Auto-closing position {fresh_trade.ticket} due to {close_reason}")
+            await self.close_trade(db, fresh_trade, auto_close=True, close_reason=close_reason)
+            return close_reason
+            
+        except Exception as e:
+            logger.error(f"Error monitoring SL/TP for trade {trade.ticket}: {e}")
+            # Retry on the next tick
+            self.track_position_levels(trade)
+            return None
+        
+        finally:
+            self.in_flight_triggers.discard(str(trade.id))
+
     async def _execute_fake_trade(self, trade: Trade):
         """Execute fake trade using current market price"""
         price_data = await self.price_service.get_price(trade.symbol)
@@ -1165,7 +1395,12 @@ class TradeService:
         """
         Close an open trade and release margin.
         """
-        if trade.status != TradeStatus.EXECUTED:
+        # Lock and re-read the row: an SL/TP, stop-out or REST close of the same trade may have won
+        result = await db.execute(
+            select(Trade).where(Trade.id == trade.id).with_for_update().execution_options(populate_existing=True)
+        )
+        trade = result.scalar_one_or_none()
+        if trade is None or trade.status != TradeStatus.EXECUTED:
             raise Exception("Trade is not open")
         
         try:
@@ -1177,8 +1412,10 @@ class TradeService:
             # Calculate closing commission
             closing_commission = trade.volume * self.commission_per_lot
             
-            # Get user and update balance
-            user_result = await db.execute(select(User).where(User.id == trade.users_id))
+            # Get user and update balance; locked so concurrent closes of the user's trades all count
+            user_result = await db.execute(
+                select(User).where(User.id == trade.users_id).with_for_update().execution_options(populate_existing=True)
+            )
             user = user_result.scalar_one()
             
             # Calculate P&L from user's perspective
@@ -1201,6 +1438,11 @@ class TradeService:
 
             await db.commit()
             
+            self.price_service.update_account_balance(str(user.id), user.balance)
+            self.price_service.publish_position_event(PositionEvent.CLOSED, trade)
+            self.untrack_position_levels(trade)
+            self.publish_trade_changed(trade)
+            
             logger.info(f"Trade closed: {trade.ticket}, Margin released: ${margin_to_release:.2f}, Net P&L: ${trade.profit:.2f}")
             if auto_close:
                 close_message = {
@@ -1213,9 +1455,8 @@ class TradeService:
                         "profit": float(trade.profit)
                     }
                 }
-                # Send to price service for WebSocket broadcast
-                if hasattr(self.price_service, '_broadcast_message'):
-                    await self.price_service._broadcast_message(close_message)
+                # Notify only the trade owner's WebSockets, whichever worker holds them
+                event_bus.publish("user_message", {"user_id": str(trade.users_id), "message": close_message})
             return trade
             
         except Exception as e:
@@ -1223,6 +1464,23 @@ class TradeService:
             raise
 
     
+    async def update_trade_levels(self, db: AsyncSession, trade: Trade, stop_loss: Optional[float] = None, take_profit: Optional[float] = None) -> Trade:
+        """
+        Update stop loss and/or take profit of an open position.
+        """
+        if stop_loss is not None:
+            trade.stop_loss = stop_loss
+        if take_profit is not None:
+            trade.take_profit = take_profit
+        
+        await db.commit()
+        await db.refresh(trade)
+        
+        self.price_service.publish_position_event(PositionEvent.MODIFIED, trade)
+        self.track_position_levels(trade)
+        self.publish_trade_changed(trade)
+        return trade
+
     async def _calculate_user_pnl(self, trade: Trade) -> float:
         """✅ FIXED: Calculate P&L from user's perspective"""
         if not trade.entry_price or not trade.exit_price:
@@ -1237,18 +1495,8 @@ class TradeService:
             price_diff = trade.entry_price - trade.exit_price
         
         # Apply point value based on symbol
-        point_value = self._get_point_value(trade.symbol)
-        contract_size  = await self.get_contract_size(trade.symbol)
-        return price_diff * trade.volume * contract_size * point_value
-    
-    def _get_point_value(self, symbol: str) -> float:
-        """Get point value for P&L calculations"""
-        if "JPY" in symbol:
-            return 0.01  # 1 pip = 0.01 for JPY pairs
-        elif symbol == "XAUUSD":
-            return 0.1   # 1 pip = $0.10 for Gold per 0.01 move
-        else:
-            return 1     # 1 pip = $1 for major pairs per 0.0001 move
+        spec = symbol_registry.get(trade.symbol)
+        return price_diff * trade.volume * spec.contract_size * spec.point_value
     
     async def _close_fake_trade(self, trade: Trade):
         """Close fake trade using current market price"""
@@ -1304,9 +1552,8 @@ class TradeService:
                     # User sold, profits when price goes down
                     price_diff = trade.entry_price - current_price
                 
-                point_value = self._get_point_value(trade.symbol)
-                contract_size  = await self.get_contract_size(trade.symbol)
-                unrealized_pnl = price_diff * trade.volume * contract_size * point_value
+                spec = symbol_registry.get(trade.symbol)
+                unrealized_pnl = price_diff * trade.volume * spec.contract_size * spec.point_value
                 
                 positions.append(PositionResponse(
                     id=trade.id,
@@ -1339,126 +1586,119 @@ class TradeService:
         current_price = (price_data["bid"] + price_data["ask"]) / 2
         
         # Calculate contract size based on symbol
-        contract_size = await self.get_contract_size(symbol)
+        contract_size = symbol_registry.get(symbol).contract_size
         
         # Calculate margin: (Volume * Contract Size * Price) / Leverage
         margin_required = (volume * contract_size * current_price) / user.leverage
         
         return margin_required
 
-    async def get_contract_size(self, symbol: str) -> float:
-            """
-            Get contract size for different symbols.
-            """
-            contract_sizes = {
-                "EURUSD": 100000,
-                "USDJPY": 100000,
-                "XAUUSD": 100,  # Gold is typically 100 oz per lot
-                # Add more symbols as needed
-            }
-            return contract_sizes.get(symbol, 100000)  # Default to 100k for forex
             
+    @staticmethod
+    def pending_order_payload(trade: Trade) -> Dict:
+        """A pending limit order as served by /pending-orders and the positions snapshot"""
+        return {
+            "id": str(trade.id),
+            "ticket": trade.ticket,
+            "symbol": trade.symbol,
+            "user_type": trade.user_type.value,
+            "volume": float(trade.volume),
+            "target_price": float(trade.entry_price),
+            "stop_loss": float(trade.stop_loss) if trade.stop_loss else None,
+            "take_profit": float(trade.take_profit) if trade.take_profit else None,
+            "status": "PENDING"
+        }
+
+    async def get_pending_orders(self, db: AsyncSession, user_id: uuid.UUID) -> List[Dict]:
+        """A user's pending limit orders from the database, so any worker can serve them"""
+        result = await db.execute(
+            select(Trade).where(
+                and_(
+                    Trade.users_id == user_id,
+                    Trade.status == TradeStatus.PENDING
+                )
+            )
+        )
+        return [self.pending_order_payload(trade) for trade in result.scalars().all()]
+
     async def get_account_info(self, db: AsyncSession, user: User) -> dict:
             """
             Get account information including leverage and margin usage.
             """
-            # Get open positions
-            open_trades = await db.execute(
-                select(Trade).where(
+            # Margin used and open position count, aggregated in the database
+            totals = await db.execute(
+                select(func.coalesce(func.sum(Trade.margin_required), 0.0), func.count(Trade.id)).where(
                     and_(
                         Trade.users_id == user.id,
                         Trade.status == TradeStatus.EXECUTED
                     )
                 )
             )
+            total_margin_used, open_positions = totals.one()
             
-            open_positions = open_trades.scalars().all()
-            
-            # Calculate total margin used
-            total_margin_used = sum(trade.margin_required or 0 for trade in open_positions)
-            
-            # Calculate free margin
-            free_margin = user.balance - total_margin_used
-            
-            # Calculate margin level (balance / margin * 100)
-            margin_level = (user.balance / total_margin_used * 100) if total_margin_used > 0 else 0
-            
+            # Same equity and margin level as the account stream: the margin engine's formula and live P&L
+            unrealized_pnl = self.price_service.margin_engine.unrealized_pnl.get(str(user.id), 0.0)
             return {
-                "balance": user.balance,
+                **account_figures(user.balance, float(total_margin_used), unrealized_pnl),
                 "leverage": user.leverage,
-                "margin_used": total_margin_used,
-                "free_margin": free_margin,
-                "margin_level": margin_level,
-                "open_positions": len(open_positions)
+                "open_positions": open_positions
             }
     
 
 
 class MarginCallService:
     """
-    Service to monitor margin levels and send margin calls.
+    Acts on the margin breaches PriceService's margin engine detects on each tick:
+    stop-outs close every open position of the account, margin calls notify the user.
+    The levels themselves are tracked in memory; only liquidation touches the database.
     """
     
     def __init__(self, trade_service: TradeService):
         self.trade_service = trade_service
-        self.margin_call_threshold = 50.0  # 50% margin level threshold
-        self.margin_stop_out = 20.0  # 20% margin level for automatic stop out
+        self.margin_call_threshold = settings.MARGIN_CALL_LEVEL
+        self.margin_stop_out = settings.MARGIN_STOP_OUT_LEVEL
     
-    async def monitor_margin_levels(self, db: AsyncSession):
-        """
-        Monitor all users' margin levels and take appropriate action.
-        """
-        # Get all users with open positions
-        users_with_positions = await db.execute(
-            select(User).join(Trade).where(
-                and_(
-                    Trade.status == TradeStatus.EXECUTED,
-                    User.is_active == True,
-                    User.is_deleted == False
-                )
-            ).distinct()
-        )
-        
-        for user in users_with_positions.scalars().all():
-            try:
-                account_info = await self.trade_service.get_account_info(db, user)
-                margin_level = account_info["margin_level"]
-                
-                if margin_level <= self.margin_stop_out:
-                    # Automatic stop out - close all positions
-                    await self._execute_stop_out(db, user)
-                elif margin_level <= self.margin_call_threshold:
-                    # Send margin call notification
-                    await self._send_margin_call(db, user, margin_level)
-                    
-            except Exception as e:
-                logger.error(f"Error monitoring margin for user {user.username}: {e}")
-    
-    async def _execute_stop_out(self, db: AsyncSession, user: User):
+    async def execute_stop_out(self, user_id: str, margin_level: float):
         """
         Close all positions for a user due to insufficient margin.
         """
-        logger.warning(f"Executing stop out for user {user.username}")
+        logger.warning(f"Executing stop out for user {user_id} - Margin level: {margin_level:.2f}%")
         
-        # Get all open positions
-        open_trades = await db.execute(
-            select(Trade).where(
-                and_(
-                    Trade.users_id == user.id,
-                    Trade.status == TradeStatus.EXECUTED
+        async with async_session() as db:
+            open_trades = await db.execute(
+                select(Trade).where(
+                    and_(
+                        Trade.users_id == uuid.UUID(user_id),
+                        Trade.status == TradeStatus.EXECUTED
+                    )
                 )
             )
-        )
+            open_trades = open_trades.scalars().all()
         
-        for trade in open_trades.scalars().all():
+        for trade in open_trades:
+            # An SL/TP close already under way finishes on its own
+            if str(trade.id) in self.trade_service.in_flight_triggers:
+                continue
             try:
-                await self.trade_service.close_trade(db, trade, auto_close=True, close_reason="Margin Stop Out")
+                # close_trade locks the row and skips it if another close got there first
+                async with async_session() as db:
+                    await self.trade_service.close_trade(db, trade, auto_close=True, close_reason="Margin Stop Out")
             except Exception as e:
                 logger.error(f"Failed to close trade {trade.ticket} during stop out: {e}")
     
-    async def _send_margin_call(self, db: AsyncSession, user: User, margin_level: float):
+    def send_margin_call(self, user_id: str, margin_level: float):
         """
         Send margin call notification to user.
         """
-        logger.warning(f"Margin call for user {user.username} - Margin level: {margin_level:.2f}%")
-        # Add your notification logic here (email, SMS, etc.)
\ No newline at end of file
+        logger.warning(f"Margin call for user {user_id} - Margin level: {margin_level:.2f}%")
+        event_bus.publish("user_message", {
+            "user_id": user_id,
+            "message": {
+                "type": "margin_call",
+                "data": {
+                    "margin_level": round(margin_level, 2),
+                    "margin_call_level": self.margin_call_threshold,
+                    "stop_out_level": self.margin_stop_out
+                }
+            }
+        })
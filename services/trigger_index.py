@@ -0,0 +1,78 @@
+import heapq
+import itertools
+from typing import Any, Dict, List, Tuple
+
+
+class PriceTriggerIndex:
+    """
+    Price levels for one symbol and side, ordered so a tick only touches the
+    levels it crossed.
+
+    Levels live in a heap whose top is always the level the market reaches
+    first: a max-heap for levels that fire when price falls to or below them,
+    a min-heap for levels that fire when price rises to or above them.
+    Insert is O(log n), removal is O(1) (the heap entry is dropped lazily)
+    and each tick costs O(log n + k) for k crossed levels.
+    """
+
+    AT_OR_BELOW = "at_or_below"  # fires when price <= level (e.g. buy limit on ask)
+    AT_OR_ABOVE = "at_or_above"  # fires when price >= level (e.g. sell limit on bid)
+
+    def __init__(self, direction: str):
+        if direction not in (self.AT_OR_BELOW, self.AT_OR_ABOVE):
+            raise ValueError(f"Unknown trigger direction: {direction}")
+        self.direction = direction
+        self._sign = -1.0 if direction == self.AT_OR_BELOW else 1.0
+        self._heap: List[Tuple[float, int, str]] = []
+        self._live: Dict[str, Tuple[float, int, Any]] = {}  # key -> (level, seq, item)
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._live
+
+    def add(self, key: str, level: float, item: Any):
+        """Insert or move a trigger level"""
+        seq = next(self._seq)
+        self._live[key] = (level, seq, item)
+        heapq.heappush(self._heap, (self._sign * level, seq, key))
+        self._maybe_compact()
+
+    def remove(self, key: str) -> bool:
+        """Drop a trigger, returns False if it was not indexed"""
+        if self._live.pop(key, None) is None:
+            return False
+        self._maybe_compact()
+        return True
+
+    def pop_crossed(self, price: float) -> List[Any]:
+        """Remove and return every item whose level the price has crossed"""
+        crossed = []
+        heap = self._heap
+        while heap:
+            sort_key, seq, key = heap[0]
+            live = self._live.get(key)
+            if live is None or live[1] != seq:
+                heapq.heappop(heap)  # cancelled or moved
+                continue
+            if not self._is_crossed(live[0], price):
+                break
+            heapq.heappop(heap)
+            del self._live[key]
+            crossed.append(live[2])
+        return crossed
+
+    def _is_crossed(self, level: float, price: float) -> bool:
+        if self.direction == self.AT_OR_BELOW:
+            return price <= level
+        return price >= level
+
+    def _maybe_compact(self):
+        """Rebuild the heap once lazily removed entries dominate it"""
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._live):
+            self._heap = [
+                (self._sign * level, seq, key) for key, (level, seq, _) in self._live.items()
+            ]
+            heapq.heapify(self._heap)
@@ -0,0 +1,13 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config.Settings requires these; the tests never open a database connection
+for key, value in {
+    "DATABASE_HOST": "localhost", "DATABASE_PORT": "5432", "DATABASE_USER": "test",
+    "DATABASE_PASSWORD": "test", "DATABASE_NAME": "test",
+}.items():
+    os.environ.setdefault(key, value)
+os.environ["MARKET_DATA_BACKEND"] = "simulator"
+os.environ["LEADER_ELECTION_ENABLED"] = "false"
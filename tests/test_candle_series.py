@@ -0,0 +1,58 @@
+from services.candle_service import TIMEFRAMES, CandleAggregator, CandleSeries
+
+MINUTE = 60_000
+
+
+def test_ticks_within_a_bar_update_it_in_place():
+    series = CandleSeries(60, capacity=4)
+    assert series.current() is None
+
+    assert series.update(1_000, 1.10, 1.0) is None
+    assert series.update(2_000, 1.12, 1.0) is None
+    assert series.update(3_000, 1.09, 2.0) is None
+    assert series.update(4_000, 1.11, 0.0) is None
+
+    assert series.current() == {
+        "open_time": 0, "open": 1.10, "high": 1.12, "low": 1.09, "close": 1.11,
+        "volume": 4.0, "tick_count": 4
+    }
+
+
+def test_new_bar_returns_the_closed_one():
+    series = CandleSeries(60, capacity=4)
+    series.update(1_000, 1.10, 0.0)
+
+    closed = series.update(MINUTE + 1, 1.20, 0.0)
+
+    assert closed["open_time"] == 0 and closed["close"] == 1.10
+    assert series.current()["open_time"] == MINUTE
+
+
+def test_late_tick_for_a_closed_bar_is_ignored():
+    series = CandleSeries(60, capacity=4)
+    series.update(MINUTE + 1, 1.20, 0.0)
+
+    assert series.update(1_000, 0.50, 0.0) is None
+    assert series.current()["low"] == 1.20
+
+
+def test_ring_keeps_the_newest_bars_oldest_first():
+    series = CandleSeries(60, capacity=3)
+    for minute in range(5):
+        series.update(minute * MINUTE, float(minute), 0.0)
+
+    assert [bar["open"] for bar in series.latest(10)] == [2.0, 3.0, 4.0]
+    assert [bar["open"] for bar in series.latest(2)] == [3.0, 4.0]
+
+
+def test_aggregator_closes_bars_per_timeframe():
+    aggregator = CandleAggregator(capacity=10)
+    aggregator.update("EURUSD", 0, 1.1)
+
+    closed = aggregator.update("EURUSD", 5 * MINUTE, 1.2)
+
+    assert sorted(timeframe for timeframe, _ in closed) == ["M1", "M5"]
+    assert set(aggregator.series["EURUSD"]) == set(TIMEFRAMES)
+    assert len(aggregator.get_candles("EURUSD", "M1")) == 2
+    assert aggregator.get_candles("GBPUSD", "M1") == []
+    assert aggregator.current("EURUSD", "H1")["close"] == 1.2
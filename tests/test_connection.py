@@ -0,0 +1,115 @@
+import asyncio
+
+from websocket.connection import ClientConnection
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def send_text(self, message):
+        await self.release.wait()
+        self.sent.append(message)
+
+    async def send_bytes(self, message):
+        await self.send_text(message)
+
+    async def close(self, code, reason):
+        self.closed_with = (code, reason)
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_conflated_frame_replaces_queued_one():
+    async def scenario():
+        connection = ClientConnection(FakeWebSocket(), max_queue=10)
+        connection.send("EURUSD 1", conflate_key="EURUSD")
+        connection.send("trade event")
+        connection.send("EURUSD 2", conflate_key="EURUSD")
+        return [message for _, message in connection.queue]
+
+    assert run(scenario()) == ["EURUSD 2", "trade event"]
+
+
+def test_final_frame_is_kept_and_later_frames_queue_behind_it():
+    async def scenario():
+        connection = ClientConnection(FakeWebSocket(), max_queue=10)
+        connection.send("M1 forming", conflate_key="M1")
+        connection.send("M1 closed", conflate_key="M1", final=True)
+        connection.send("M1 next", conflate_key="M1")
+        connection.send("M1 next 2", conflate_key="M1")
+        return [message for _, message in connection.queue]
+
+    assert run(scenario()) == ["M1 forming", "M1 closed", "M1 next 2"]
+
+
+def test_full_queue_drops_oldest_conflatable_frame():
+    async def scenario():
+        connection = ClientConnection(FakeWebSocket(), max_queue=3)
+        connection.send("position")
+        connection.send("EURUSD", conflate_key="EURUSD")
+        connection.send("GBPUSD", conflate_key="GBPUSD")
+        assert connection.send("trade event") is True
+        return [message for _, message in connection.queue], set(connection.queued_by_key), connection.closed
+
+    queued, keys, closed = run(scenario())
+    assert queued == ["position", "GBPUSD", "trade event"]
+    assert keys == {"GBPUSD"}
+    assert not closed
+
+
+def test_queue_full_of_ordered_frames_closes_the_connection():
+    async def scenario():
+        websocket = FakeWebSocket()
+        closed = []
+        connection = ClientConnection(websocket, max_queue=2)
+        connection.start(on_close=closed.append)
+        websocket.release.clear()
+        for i in range(3):
+            connection.send(f"event {i}")
+        await asyncio.sleep(0)
+        assert connection.send("event 3") is False
+        await asyncio.sleep(0.01)
+        return connection, websocket, closed
+
+    connection, websocket, closed = run(scenario())
+    assert connection.closed
+    assert closed == [connection]
+    assert websocket.closed_with[1] == "slow consumer"
+
+
+def test_consumer_behind_for_too_long_is_closed():
+    async def scenario():
+        connection = ClientConnection(FakeWebSocket(), max_queue=1, slow_timeout=0.0)
+        connection.send("EURUSD 1", conflate_key="EURUSD")
+        connection.send("GBPUSD 1", conflate_key="GBPUSD")
+        await asyncio.sleep(0.001)
+        connection.send("USDJPY 1", conflate_key="USDJPY")
+        return connection.closed
+
+    assert run(scenario()) is True
+
+
+def test_writer_delivers_in_order_and_stops_on_close():
+    async def scenario():
+        websocket = FakeWebSocket()
+        connection = ClientConnection(websocket, max_queue=10)
+        connection.start()
+        connection.send("a")
+        connection.send(b"b")
+        connection.send_message({"type": "c"})
+        await asyncio.sleep(0.01)
+        connection.close()
+        assert connection.send("d") is False
+        await asyncio.sleep(0)
+        return websocket.sent, connection.frames_sent
+
+    sent, frames_sent = run(scenario())
+    assert sent[:2] == ["a", b"b"]
+    assert '"c"' in sent[2]
+    assert frames_sent == 3
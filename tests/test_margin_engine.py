@@ -0,0 +1,74 @@
+import uuid
+from datetime import datetime
+
+import models.user  # noqa: F401  (registers the users table for Trade's foreign key)
+from models.trade import Trade, TradeStatus, TradeType
+from services.margin_engine import MarginEngine
+from services.price_service import PositionEvent, PriceService
+
+
+def make_trade(user_id, margin_required=100.0, **fields):
+    values = dict(
+        id=uuid.uuid4(), ticket="T1", users_id=user_id, symbol="EURUSD", user_type=TradeType.BUY,
+        volume=1.0, entry_price=1.1, margin_required=margin_required, stop_loss=None,
+        take_profit=None, open_time=datetime.now(), status=TradeStatus.EXECUTED
+    )
+    values.update(fields)
+    return Trade(**values)
+
+
+def test_replace_only_position_keeps_balance():
+    engine = MarginEngine(margin_call_level=50.0, stop_out_level=20.0)
+    user_id = uuid.uuid4()
+    trade = make_trade(user_id)
+    engine.add_position(trade)
+    engine.set_balance(str(user_id), 500.0)
+
+    modified = make_trade(user_id, id=trade.id, stop_loss=1.0)
+    engine.replace_position(trade, modified)
+
+    assert engine.snapshot(str(user_id))["balance"] == 500.0
+    assert engine.margin_used[str(user_id)] == 100.0
+    stop_outs, margin_calls = engine.update_symbol_pnl("EURUSD", {str(user_id): -1500.0})
+    assert [user for user, _ in stop_outs] == [str(user_id)]
+
+
+def test_modified_event_keeps_only_position_monitored():
+    price_service = PriceService()
+    user_id = uuid.uuid4()
+    trade = make_trade(user_id)
+    price_service.publish_position_event(PositionEvent.OPENED, trade)
+    price_service.margin_engine.set_balance(str(user_id), 500.0)
+
+    price_service.publish_position_event(PositionEvent.MODIFIED, make_trade(user_id, id=trade.id, take_profit=1.2))
+
+    engine = price_service.margin_engine
+    assert engine.margin_level(str(user_id)) is not None
+    stop_outs, _ = engine.update_symbol_pnl("EURUSD", {str(user_id): -1500.0})
+    assert [user for user, _ in stop_outs] == [str(user_id)]
+
+
+def test_closed_position_pnl_is_not_counted_after_close():
+    price_service = PriceService()
+    engine = price_service.margin_engine
+    user_id = uuid.uuid4()
+    gold = make_trade(user_id, margin_required=1000.0, symbol="XAUUSD", entry_price=2000.0)
+    euro = make_trade(user_id, margin_required=100.0, volume=0.01)
+    price_service.publish_position_event(PositionEvent.OPENED, gold)
+    price_service.publish_position_event(PositionEvent.OPENED, euro)
+    engine.set_balance(str(user_id), 100.0)
+
+    # 1 lot of gold 90.00 under entry: -900
+    gold_pnl = price_service._calculate_position_pnl("XAUUSD", 1910.0, 1910.5, {})
+    assert gold_pnl[str(user_id)] == -900.0
+    engine.update_symbol_pnl("XAUUSD", gold_pnl)
+
+    # Closing realizes the loss into the balance: 100 + 1000 margin back - 900
+    price_service.publish_position_event(PositionEvent.CLOSED, gold)
+    engine.set_balance(str(user_id), 200.0)
+
+    stop_outs, margin_calls = engine.update_symbol_pnl(
+        "EURUSD", price_service._calculate_position_pnl("EURUSD", 1.1, 1.1001, {})
+    )
+    assert (stop_outs, margin_calls) == ([], [])
+    assert engine.margin_level(str(user_id)) == 300.0
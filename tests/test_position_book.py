@@ -0,0 +1,98 @@
+import uuid
+from datetime import datetime
+
+import pytest
+
+import models.user  # noqa: F401  (registers the users table for Trade's foreign key)
+from models.trade import Trade, TradeStatus, TradeType
+from services.position_book import PositionBook
+
+
+def make_trade(user_type=TradeType.BUY, volume=1.0, entry_price=1.1):
+    return Trade(
+        id=uuid.uuid4(), ticket="T1", users_id=uuid.uuid4(), symbol="EURUSD", user_type=user_type,
+        volume=volume, entry_price=entry_price, margin_required=100.0, open_time=datetime.now(),
+        status=TradeStatus.EXECUTED
+    )
+
+
+def make_book(capacity=64):
+    return PositionBook("EURUSD", contract_size=100000, point_value=1.0, pip_multiplier=10000, capacity=capacity)
+
+
+def test_buys_close_at_bid_and_sells_at_ask():
+    book = make_book()
+    book.add(make_trade(TradeType.BUY, entry_price=1.1000))
+    book.add(make_trade(TradeType.SELL, volume=0.5, entry_price=1.1010))
+
+    current_price, price_diff, unrealized_pnl, pips = book.compute(1.1010, 1.1012)
+
+    assert current_price.tolist() == [1.1010, 1.1012]
+    assert unrealized_pnl.tolist() == pytest.approx([100.0, -10.0])
+    assert pips.tolist() == pytest.approx([10.0, -2.0])
+
+
+def test_remove_swaps_last_row_into_the_hole():
+    book = make_book()
+    trades = [make_trade(entry_price=1.1 + i / 1000) for i in range(3)]
+    for trade in trades:
+        book.add(trade)
+
+    assert book.remove(str(trades[0].id)) is True
+    assert book.remove(str(trades[0].id)) is False
+    assert len(book) == 2
+    assert book.row_by_id[str(trades[2].id)] == 0
+    assert book.entry_price[0] == pytest.approx(1.102)
+    assert book.trades == [trades[2], trades[1]]
+    assert [row["id"] for row in book.stream_fields] == [str(trades[2].id), str(trades[1].id)]
+
+
+def test_columns_grow_past_initial_capacity():
+    book = make_book(capacity=2)
+    trades = [make_trade(entry_price=1.0) for _ in range(5)]
+    for trade in trades:
+        book.add(trade)
+
+    assert len(book) == 5
+    assert len(book.entry_price) >= 5
+    _, _, unrealized_pnl, _ = book.compute(1.001, 1.002)
+    assert unrealized_pnl.tolist() == pytest.approx([100.0] * 5)
+
+
+def test_readding_a_trade_replaces_its_row():
+    book = make_book()
+    trade = make_trade(entry_price=1.1)
+    book.add(trade)
+    trade.entry_price = 1.2
+    book.add(trade)
+
+    assert len(book) == 1
+    assert book.entry_price[0] == 1.2
+
+
+def test_last_pnl_follows_the_row_it_belongs_to():
+    book = make_book()
+    first, second = make_trade(entry_price=1.1), make_trade(entry_price=1.0)
+    book.add(first)
+    book.add(second)
+    assert book.last_pnl_of(str(second.id)) == 0.0
+
+    book.compute(1.101, 1.102)
+    book.remove(str(first.id))
+
+    assert book.last_pnl_of(str(second.id)) == pytest.approx(10100.0)
+    assert book.last_pnl_of(str(first.id)) == 0.0
+
+
+def test_stream_row_matches_compute():
+    book = make_book()
+    trade = make_trade(TradeType.SELL, entry_price=1.1)
+    book.add(trade)
+
+    row = book.stream_row(str(trade.id), 1.098, 1.099)
+
+    assert row["id"] == str(trade.id)
+    assert row["current_price"] == 1.099
+    assert row["unrealized_pnl"] == pytest.approx(100.0)
+    assert row["pips"] == pytest.approx(10.0)
+    assert book.stream_row(str(uuid.uuid4()), 1.0, 1.0) is None
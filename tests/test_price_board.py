@@ -0,0 +1,59 @@
+import os
+from multiprocessing import resource_tracker
+
+import pytest
+
+from services.price_board import PriceBoard
+
+SYMBOLS = ["EURUSD", "GBPUSD"]
+
+
+@pytest.fixture
+def board():
+    board = PriceBoard.create(SYMBOLS, name=f"test_board_{os.getpid()}")
+    yield board
+    board.close()
+
+
+def attach(board, symbols=SYMBOLS):
+    try:
+        return PriceBoard.attach(symbols, name=board.shm.name)
+    finally:
+        # attach() unregisters the segment for this whole process, the owner included
+        resource_tracker.register(board.shm._name, "shared_memory")
+
+
+def test_published_quote_is_read_back(board):
+    assert board.read("EURUSD") is None
+
+    board.publish("EURUSD", {"time_msc": 1_700_000_000_123, "bid": 1.1, "ask": 1.1002, "volume": 3.0})
+
+    assert board.read("EURUSD") == {
+        "bid": 1.1, "ask": 1.1002, "time": 1_700_000_000, "time_msc": 1_700_000_000_123, "volume": 3.0
+    }
+    assert board.seqs[0] % 2 == 0
+    assert board.read_all(SYMBOLS + ["USDJPY"]) == {"EURUSD": board.read("EURUSD")}
+
+
+def test_reader_attached_from_another_handle_sees_writes(board):
+    reader = attach(board)
+    try:
+        board.publish("GBPUSD", {"time": 1_700_000_000, "bid": 1.25, "ask": 1.2502})
+        assert reader.read("GBPUSD")["time_msc"] == 1_700_000_000_000
+        assert reader.read("USDJPY") is None
+    finally:
+        reader.close()
+    # Closing a reader leaves the segment in place for the feed
+    assert board.read("GBPUSD")["bid"] == 1.25
+
+
+def test_attach_rejects_a_board_for_other_symbols(board):
+    with pytest.raises(ValueError):
+        attach(board, ["EURUSD"])
+
+
+def test_slot_left_mid_write_reads_as_missing(board):
+    board.publish("EURUSD", {"time_msc": 1, "bid": 1.1, "ask": 1.1002})
+    board.seqs[0] += 1  # a writer that died between the two sequence bumps
+
+    assert board.read("EURUSD") is None
@@ -0,0 +1,64 @@
+import pytest
+
+from services.trigger_index import PriceTriggerIndex
+
+
+def test_pops_only_crossed_levels_in_order():
+    index = PriceTriggerIndex(PriceTriggerIndex.AT_OR_BELOW)
+    for key, level in (("a", 1.10), ("b", 1.12), ("c", 1.08)):
+        index.add(key, level, key)
+
+    assert index.pop_crossed(1.13) == []
+    assert index.pop_crossed(1.10) == ["b", "a"]
+    assert len(index) == 1 and "c" in index
+
+    above = PriceTriggerIndex(PriceTriggerIndex.AT_OR_ABOVE)
+    above.add("x", 2.0, "x")
+    above.add("y", 1.5, "y")
+    assert above.pop_crossed(1.7) == ["y"]
+
+
+def test_unknown_direction_is_rejected():
+    with pytest.raises(ValueError):
+        PriceTriggerIndex("sideways")
+
+
+def test_removed_trigger_never_fires():
+    index = PriceTriggerIndex(PriceTriggerIndex.AT_OR_ABOVE)
+    index.add("a", 1.0, "a")
+    index.add("b", 1.0, "b")
+
+    assert index.remove("a") is True
+    assert index.remove("a") is False
+    assert "a" not in index
+    assert index.pop_crossed(2.0) == ["b"]
+    # The stale heap entry was discarded on the way
+    assert index._heap == []
+
+
+def test_moved_trigger_fires_at_its_new_level_only():
+    index = PriceTriggerIndex(PriceTriggerIndex.AT_OR_BELOW)
+    index.add("sl", 1.10, "old")
+    index.add("sl", 1.05, "new")
+
+    assert len(index) == 1
+    assert index.pop_crossed(1.09) == []
+    assert index.pop_crossed(1.05) == ["new"]
+    assert index.pop_crossed(0.0) == []
+
+
+def test_heap_is_compacted_once_dead_entries_dominate():
+    index = PriceTriggerIndex(PriceTriggerIndex.AT_OR_ABOVE)
+    for i in range(200):
+        index.add(str(i), float(i), i)
+    for i in range(190):
+        index.remove(str(i))
+
+    assert len(index) == 10
+    assert len(index._heap) <= 64
+    assert index.pop_crossed(1000.0) == list(range(190, 200))
+
+    for _ in range(100):
+        index.add("moving", 5.0, "moving")
+    assert len(index._heap) <= 64
+    assert index.pop_crossed(5.0) == ["moving"]
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Set
+
+from fastapi import status
+
+from config import settings
+from services.metrics import increment
+from websocket.encoding import JSON, Payload, encode
+
+logger = logging.getLogger(__name__)
+
+
+class ClientConnection:
+    """
+    One WebSocket client with a bounded outbound queue drained by its own
+    writer task, so the price loop hands frames off and never awaits a socket.
+
+    Frames sent with a conflate_key (latest price per symbol, forming candle)
+    replace a queued frame with the same key instead of queuing behind it.
+    When the queue is full the oldest such frame is dropped to make room;
+    everything else (positions, trade events) is only ever delivered in order.
+    A final frame for a key (a closed candle) is never replaced or dropped and
+    later frames for that key queue behind it.
+
+    A client that keeps its queue full for WS_SLOW_CONSUMER_TIMEOUT seconds, or
+    fills it with frames that cannot be dropped, is disconnected.
+    """
+
+    def __init__(self, websocket, user_id: Optional[str] = None, fmt: str = JSON,
+                 max_queue: int = settings.WS_SEND_QUEUE_SIZE,
+                 slow_timeout: float = settings.WS_SLOW_CONSUMER_TIMEOUT):
+        self.websocket = websocket
+        self.user_id = user_id
+        self.format = fmt  # wire format negotiated at connect, see websocket/encoding.py
+        self.max_queue = max_queue
+        self.slow_timeout = slow_timeout
+        self.queue: Deque[List] = deque()  # [conflate_key, message]
+        self.queued_by_key: Dict[str, List] = {}  # conflate_key -> its queued entry
+        self.behind_since: Optional[float] = None  # when the queue last filled up
+        self.topics: Set[str] = set()  # subscribed topics, see websocket/topics.py
+        self.explicit_topics = False  # True once the client chose its own topics
+        self.frames_sent = 0
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._on_close: Optional[Callable[["ClientConnection"], None]] = None
+
+    def start(self, on_close: Optional[Callable[["ClientConnection"], None]] = None):
+        """Start the writer task; on_close runs once, soon after the connection is dropped"""
+        self._on_close = on_close
+        if self.closed:
+            # Dropped before it started, e.g. its subscription snapshots overflowed the queue
+            if on_close is not None:
+                asyncio.get_event_loop().call_soon(on_close, self)
+            return
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def send_message(self, message: Dict) -> bool:
+        """Encode and queue a message meant for this connection only"""
+        return self.send(encode(message, self.format))
+
+    def send(self, message: Payload, conflate_key: Optional[str] = None, final: bool = False) -> bool:
+        """Queue an encoded frame; never awaits. Returns False once the connection is closed."""
+        if self.closed:
+            return False
+
+        if final and conflate_key is not None:
+            self.queued_by_key.pop(conflate_key, None)
+            conflate_key = None
+        elif conflate_key is not None:
+            entry = self.queued_by_key.get(conflate_key)
+            if entry is not None:
+                entry[1] = message
+                increment("ws.frames_conflated")
+                return True
+
+        if len(self.queue) >= self.max_queue:
+            now = time.monotonic()
+            if self.behind_since is None:
+                self.behind_since = now
+            if now - self.behind_since > self.slow_timeout or not self._drop_oldest_conflatable():
+                self.close(status.WS_1013_TRY_AGAIN_LATER, "slow consumer")
+                increment("ws.slow_consumers_disconnected")
+                return False
+
+        entry = [conflate_key, message]
+        self.queue.append(entry)
+        if conflate_key is not None:
+            self.queued_by_key[conflate_key] = entry
+        self._wakeup.set()
+        return True
+
+    def _drop_oldest_conflatable(self) -> bool:
+        for i, entry in enumerate(self.queue):
+            if entry[0] is not None:
+                del self.queue[i]
+                del self.queued_by_key[entry[0]]
+                increment("ws.frames_dropped")
+                return True
+        return False
+
+    async def _write_loop(self):
+        try:
+            while True:
+                if not self.queue:
+                    self.behind_since = None
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                conflate_key, message = entry = self.queue.popleft()
+                if conflate_key is not None and self.queued_by_key.get(conflate_key) is entry:
+                    del self.queued_by_key[conflate_key]
+                if isinstance(message, bytes):
+                    await self.websocket.send_bytes(message)
+                else:
+                    await self.websocket.send_text(message)
+                self.frames_sent += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.debug(f"WebSocket send failed: {e}")
+            self.close()
+
+    def close(self, code: int = status.WS_1000_NORMAL_CLOSURE, reason: str = ""):
+        """Stop the writer, drop queued frames and close the socket; safe to call more than once"""
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        self.queued_by_key.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+        if reason:
+            logger.warning(f"Disconnecting WebSocket client{f' of user {self.user_id}' if self.user_id else ''}: {reason}")
+            asyncio.ensure_future(self._close_socket(code, reason))
+        if self._on_close is not None:
+            # Deferred: close() can run inside a fan-out loop over the registry's sets
+            asyncio.get_event_loop().call_soon(self._on_close, self)
+
+    async def _close_socket(self, code: int, reason: str):
+        try:
+            await asyncio.wait_for(self.websocket.close(code=code, reason=reason), timeout=self.slow_timeout)
+        except Exception as e:
+            logger.debug(f"WebSocket close failed: {e}")
@@ -0,0 +1,79 @@
+"""
+Outbound WebSocket frame encoding.
+
+Every message is encoded once per fan-out and the same payload is queued on
+every connection that wants it. JSON frames use orjson when it is installed
+(stdlib json otherwise) and go out as text; clients that connect with
+?format=msgpack get MessagePack binary frames, if msgpack is installed.
+Datetimes are encoded as epoch milliseconds in both formats.
+"""
+
+import enum
+import json
+import time
+from datetime import date, datetime
+from typing import Any, Dict, List, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = "json"
+MSGPACK = "msgpack"
+
+Payload = Union[str, bytes]
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def now_ms() -> int:
+    """Current time as epoch milliseconds, the timestamp format of every streamed frame"""
+    return int(time.time() * 1000)
+
+
+def available_formats() -> List[str]:
+    return [JSON, MSGPACK] if msgpack is not None else [JSON]
+
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    return str(value)
+
+
+def encode(message: Dict, fmt: str = JSON) -> Payload:
+    """Encode one message: str for JSON text frames, bytes for MessagePack binary frames"""
+    if fmt == MSGPACK:
+        return msgpack.packb(message, default=_default, use_bin_type=True)
+    if orjson is not None:
+        return orjson.dumps(message, default=_default, option=ORJSON_OPTIONS).decode()
+    return json.dumps(message, default=_default, separators=(",", ":"))
+
+
+class Frame:
+    """One outbound message, encoded at most once per wire format however many connections get it"""
+
+    __slots__ = ("message", "encoded")
+
+    def __init__(self, message: Dict):
+        self.message = message
+        self.encoded: Dict[str, Payload] = {}
+
+    def encode(self, fmt: str) -> Payload:
+        payload = self.encoded.get(fmt)
+        if payload is None:
+            payload = self.encoded[fmt] = encode(self.message, fmt)
+        return payload
@@ -97,78 +97,101 @@
 
 
 
-from fastapi import WebSocket, WebSocketDisconnect
+from fastapi import WebSocket, WebSocketDisconnect, status
+from sqlalchemy import select
 import json
 import logging
-from typing import List, Dict
+import uuid
+from typing import List, Optional
 from auth.jwt_handler import verify_token
+from database import async_session
+from models.user import User
+from services.event_bus import event_bus
+from websocket.connection import ClientConnection
+from websocket.encoding import JSON, Frame, available_formats
+from websocket.registry import registry
+from websocket.topics import POSITIONS, candle_topic, price_topic, validate_topic
 
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
     def __init__(self):
-        self.active_connections: List[WebSocket] = []
-        self.user_connections: Dict[str, WebSocket] = {}
-    
-    async def connect(self, websocket: WebSocket, token: str = None):
-        await websocket.accept()
-        
-        # Optionally authenticate WebSocket connection
-        # if token:
-        #     username = verify_token(token)
-        #     if username:
-        #         self.user_connections[username] = websocket
+        # Shared with the price service: one set-based index of this worker's sockets
+        self.registry = registry
         
-        self.active_connections.append(websocket)
-        logger.info(f"WebSocket connected. Total connections: {len(self.active_connections)}")
+        # Messages for a user may be published by any worker
+        event_bus.subscribe("user_message", self._on_user_message)
     
-    def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+    async def authenticate(self, token: str) -> Optional[str]:
+        """Resolve a JWT to the id of an active user"""
+        username = verify_token(token)
+        if not username:
+            return None
         
-        # Remove from user connections
-        for username, ws in list(self.user_connections.items()):
-            if ws == websocket:
-                del self.user_connections[username]
-                break
+        async with async_session() as db:
+            result = await db.execute(select(User).where(User.username == username))
+            user = result.scalar_one_or_none()
         
-        logger.info(f"WebSocket disconnected. Total connections: {len(self.active_connections)}")
-    
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        try:
-            await websocket.send_text(message)
-        except:
-            self.disconnect(websocket)
-    
-    async def send_to_user(self, username: str, message: dict):
-        if username in self.user_connections:
-            try:
-                await self.user_connections[username].send_text(
-                    json.dumps(message, default=str)
-                )
-            except:
-                self.disconnect(self.user_connections[username])
-    
-    async def broadcast(self, message: dict):
-        disconnected = []
-        for websocket in self.active_connections:
-            try:
-                await websocket.send_text(json.dumps(message, default=str))
-            except:
-                disconnected.append(websocket)
-        
-        # Remove disconnected websockets
-        for ws in disconnected:
-            self.disconnect(ws)
+        if not user or not user.is_active or user.is_deleted:
+            return None
+        return str(user.id)
+    
+    async def connect(self, websocket: WebSocket, user_id: Optional[str] = None, fmt: str = JSON) -> ClientConnection:
+        await websocket.accept()
+        connection = ClientConnection(websocket, user_id, fmt)
+        self.registry.add(connection)
+        logger.info(f"WebSocket connected. Total connections: {len(self.registry)}")
+        return connection
+    
+    def disconnect(self, connection: ClientConnection):
+        """Forget a connection, its user index entry and its topics"""
+        if self.registry.remove(connection):
+            logger.info(f"WebSocket disconnected. Total connections: {len(self.registry)}")
+    
+    def _on_user_message(self, data: dict):
+        self.send_to_user(data["user_id"], data["message"])
+    
+    def send_to_user(self, user_id: str, message: dict):
+        """Queue a message for the user's connections to this worker"""
+        connections = self.registry.user_connections(user_id)
+        if not connections:
+            return
+        frame = Frame(message)
+        for connection in connections:
+            connection.send(frame.encode(connection.format))
 
 manager = ConnectionManager()
 
-async def websocket_endpoint(websocket: WebSocket, token: str = None):
-    await manager.connect(websocket, token)
+async def websocket_endpoint(websocket: WebSocket, token: str = None, format: str = JSON):
+    """
+    Streams topics to a client. Every topic starts with a snapshot frame
+    {"type": "snapshot", "version", "topic", "seq", "data"}; the topic's later frames carry
+    the same "topic" and a seq that continues from it (frames with seq <= the snapshot's
+    are older and can be ignored). positions deltas are positions_update (P&L),
+    position_opened/_modified/_closed and order_placed/_cancelled/_filled, so the snapshot's
+    positions and orders stay current. A client that sees a gap in a positions seq sends
+    {"type": "resync", "topics": [...]} and gets fresh snapshots instead of polling REST.
+    """
+    # ?format=msgpack switches server frames to MessagePack; client messages stay JSON text
+    if format not in available_formats():
+        await websocket.close(code=status.WS_1003_UNSUPPORTED_DATA)
+        return
+    
+    # Anonymous sockets only receive prices; positions and trade events need a valid token
+    user_id = None
+    if token:
+        user_id = await manager.authenticate(token)
+        if not user_id:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
     
-    # Add to price service subscribers
+    connection = await manager.connect(websocket, user_id, format)
+    
+    # Apply the default topics; every frame goes out through the connection's queue
     from main import app
-    app.state.price_service.add_subscriber(websocket)
+    pending_orders = await _load_pending_orders(user_id) if user_id else None
+    app.state.price_service.add_subscriber(connection, user_id, pending_orders)
+    connection.start(on_close=_on_connection_closed)
     
     try:
         while True:
@@ -176,18 +199,74 @@ async def websocket_endpoint(websocket: WebSocket, token: str = None):
             data = await websocket.receive_text()
             message = json.loads(data)
             
-            if message.get("type") == "subscribe":
-                # Handle subscription logic if needed
-                symbols = message.get("symbols", [])
-                await websocket.send_text(json.dumps({
-                    "type": "subscription_confirmed",
-                    "symbols": symbols
-                }))
+            if message.get("type") in ("subscribe", "subscribe_candles"):
+                topics = _requested_topics(connection, message)
+                if topics and "topics" not in message:
+                    app.state.price_service.subscribe_legacy(connection, topics)
+                elif topics:
+                    pending_orders = await _load_pending_orders(user_id) if POSITIONS in topics else None
+                    app.state.price_service.subscribe(connection, topics, pending_orders)
+                if topics:
+                    connection.send_message({
+                        "type": "subscription_confirmed",
+                        "topics": topics
+                    })
+            
+            elif message.get("type") == "resync":
+                topics = _requested_topics(connection, message)
+                if topics:
+                    pending_orders = await _load_pending_orders(user_id) if POSITIONS in topics else None
+                    app.state.price_service.resync(connection, topics, pending_orders)
+            
+            elif message.get("type") in ("unsubscribe", "unsubscribe_candles"):
+                topics = _requested_topics(connection, message)
+                if topics:
+                    app.state.price_service.unsubscribe(connection, topics)
+                    connection.send_message({
+                        "type": "unsubscription_confirmed",
+                        "topics": topics
+                    })
             
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
-        app.state.price_service.remove_subscriber(websocket)
+        pass
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
-        manager.disconnect(websocket)
-        app.state.price_service.remove_subscriber(websocket)
+    finally:
+        connection.close()
+
+async def _load_pending_orders(user_id: str) -> Optional[List[dict]]:
+    """The user's pending orders for the positions snapshot; None (left out of the snapshot) if they cannot be read"""
+    from main import app
+    try:
+        async with async_session() as db:
+            return await app.state.trade_service.get_pending_orders(db, uuid.UUID(user_id))
+    except Exception as e:
+        logger.error(f"Failed to load pending orders for user {user_id}: {e}")
+        return None
+
+def _requested_topics(connection: ClientConnection, message: dict) -> List[str]:
+    """
+    Topics named by a (un)subscribe message, reporting invalid ones to the client.
+    Also accepts the older {"symbols": [...]} and subscribe_candles {"symbol", "timeframe"} forms.
+    """
+    if message["type"].endswith("_candles"):
+        topics = [candle_topic(message.get("symbol"), message.get("timeframe", "M1"))]
+    elif "topics" in message:
+        topics = message["topics"]
+    else:
+        topics = [price_topic(symbol) for symbol in message.get("symbols", [])]
+    if not isinstance(topics, list):
+        topics = []
+    
+    valid = []
+    for topic in topics:
+        error = validate_topic(topic, connection.user_id)
+        if error:
+            connection.send_message({"type": "error", "message": error})
+        else:
+            valid.append(topic)
+    return valid
+
+def _on_connection_closed(connection: ClientConnection):
+    """Forget a connection everywhere, whether the client left or was dropped as a slow consumer"""
+    manager.disconnect(connection)
@@ -0,0 +1,97 @@
+from typing import Dict, Optional, Set
+
+from websocket.topics import routing_key
+
+
+class ConnectionRegistry:
+    """
+    Every WebSocket connection open in this worker, shared by the connection
+    manager and the price service.
+
+    Membership, the per-user index and topic routing are all dicts of sets,
+    so connecting or disconnecting costs O(topics of that connection) however
+    many sockets are open, and a user may have any number of tabs.
+    Per-connection metadata (user, wire format, topics) lives on the
+    ClientConnection, found from its raw socket through connections.
+
+    Fan-out iterates these sets without copying them: ClientConnection.close()
+    defers its on_close callback, so nothing is removed mid-iteration.
+    """
+
+    def __init__(self):
+        self.connections: Dict = {}  # raw WebSocket -> its ClientConnection
+        self.by_user: Dict[str, Set] = {}  # user_id -> that user's connections
+        self.by_topic: Dict[str, Set] = {}  # routing key -> subscribed connections
+
+    def __len__(self) -> int:
+        return len(self.connections)
+
+    def __contains__(self, connection) -> bool:
+        return self.connections.get(connection.websocket) is connection
+
+    def get(self, websocket):
+        """The connection registered for a raw socket, if any"""
+        return self.connections.get(websocket)
+
+    def add(self, connection) -> bool:
+        """Register a connection; False if it already is"""
+        if connection in self:
+            return False
+        self.connections[connection.websocket] = connection
+        if connection.user_id:
+            self.by_user.setdefault(connection.user_id, set()).add(connection)
+        for topic in connection.topics:
+            self.by_topic.setdefault(routing_key(topic, connection.user_id), set()).add(connection)
+        return True
+
+    def remove(self, connection) -> bool:
+        """Forget a connection and all of its topics; False if it was not registered"""
+        if connection not in self:
+            return False
+        del self.connections[connection.websocket]
+        if connection.user_id:
+            self._discard(self.by_user, connection.user_id, connection)
+        for topic in connection.topics:
+            self._discard(self.by_topic, routing_key(topic, connection.user_id), connection)
+        connection.topics.clear()
+        return True
+
+    def add_topic(self, connection, topic: str) -> bool:
+        """Route a topic to a connection; False if it already was"""
+        if topic in connection.topics:
+            return False
+        connection.topics.add(topic)
+        self.by_topic.setdefault(routing_key(topic, connection.user_id), set()).add(connection)
+        return True
+
+    def remove_topic(self, connection, topic: str) -> bool:
+        """Stop routing a topic to a connection; False if it was not subscribed"""
+        if topic not in connection.topics:
+            return False
+        connection.topics.discard(topic)
+        self._discard(self.by_topic, routing_key(topic, connection.user_id), connection)
+        return True
+
+    def user_connections(self, user_id: str) -> Optional[Set]:
+        return self.by_user.get(user_id)
+
+    def topic_connections(self, key: str) -> Optional[Set]:
+        return self.by_topic.get(key)
+
+    @staticmethod
+    def _discard(index: Dict[str, Set], key: str, connection):
+        connections = index.get(key)
+        if connections is not None:
+            connections.discard(connection)
+            if not connections:
+                del index[key]
+
+    def get_stats(self) -> Dict:
+        return {
+            "connections": len(self.connections),
+            "users": len(self.by_user),
+            "topics": len(self.by_topic)
+        }
+
+
+registry = ConnectionRegistry()
@@ -0,0 +1,45 @@
+from typing import Optional, Set
+
+from config import settings
+from services.candle_service import TIMEFRAMES
+
+# Per-user topics: the user's own position P&L stream and account figures
+POSITIONS = "positions"
+ACCOUNT = "account"
+USER_TOPICS = (POSITIONS, ACCOUNT)
+
+
+def price_topic(symbol: str) -> str:
+    return f"prices:{symbol}"
+
+
+def candle_topic(symbol: str, timeframe: str) -> str:
+    return f"candles:{symbol}:{timeframe}"
+
+
+def routing_key(topic: str, user_id: Optional[str]) -> str:
+    """Key a topic's subscribers are indexed under: "<topic>:<user_id>" for per-user topics"""
+    return f"{topic}:{user_id}" if topic in USER_TOPICS else topic
+
+
+def default_topics(user_id: Optional[str]) -> Set[str]:
+    """
+    What a client that never subscribes receives, as before topics existed: every
+    price, plus its own positions (with account figures embedded) when authenticated
+    """
+    topics = {price_topic(symbol) for symbol in settings.SYMBOLS}
+    if user_id:
+        topics.add(POSITIONS)
+    return topics
+
+
+def validate_topic(topic: str, user_id: Optional[str]) -> Optional[str]:
+    """Error message for a topic the client may not subscribe to, None if it is valid"""
+    parts = topic.split(":") if isinstance(topic, str) else []
+    if parts[:1] == ["prices"] and len(parts) == 2 and parts[1] in settings.SYMBOLS:
+        return None
+    if parts[:1] == ["candles"] and len(parts) == 3 and parts[1] in settings.SYMBOLS and parts[2] in TIMEFRAMES:
+        return None
+    if topic in USER_TOPICS:
+        return None if user_id else f"Topic {topic} requires an authenticated connection"
+    return f"Unknown topic {topic}"